@@ -103,7 +103,11 @@ export class ApiInfo implements IApiInfo {
     constructor(public raw_info: any) {
         this.root_url = raw_info.root_url;
         this.title = raw_info.title;
-        this.resources = raw_info.resources;
+        // Identical subtrees of fields are sent once in "shared" section
+        // if api_info was requested with "mode=shared" query parameter.
+        this.resources = raw_info.shared
+            ? resolveSharedRefs(raw_info.resources, raw_info.shared, {})
+            : raw_info.resources;
         this.extra = raw_info.extra;
 
         const file_inputs: {[name: string]: string[]} = {};
@@ -258,6 +262,36 @@ export class ApiInfo implements IApiInfo {
 }
 
 
+const SHARED_REF_KEY = '$ref';
+
+
+function resolveSharedRefs(value: any, shared: {[id: string]: any}, resolved: {[id: string]: any}): any {
+    if (value instanceof Array) {
+        return value.map(item => resolveSharedRefs(item, shared, resolved));
+    }
+    if (value === null || typeof value !== 'object') {
+        return value;
+    }
+    const ref_id = value[SHARED_REF_KEY];
+    if (typeof ref_id === 'string' && Object.keys(value).length === 1) {
+        if (!Object.prototype.hasOwnProperty.call(resolved, ref_id)) {
+            if (!Object.prototype.hasOwnProperty.call(shared, ref_id)) {
+                console.warn(`ApiInfo: Unknown shared subtree with an id "${ref_id}".`);
+                return value;
+            }
+            // Resolved subtrees are read-only, so they are shared too.
+            resolved[ref_id] = resolveSharedRefs(shared[ref_id], shared, resolved);
+        }
+        return resolved[ref_id];
+    }
+    const result: {[key: string]: any} = {};
+    for (const key in value) {
+        result[key] = resolveSharedRefs(value[key], shared, resolved);
+    }
+    return result;
+}
+
+
 function getFileInputNames(fields_array: IField[], prefix: string): string[] {
     let names: string[] = [];
     for (const i in fields_array) {
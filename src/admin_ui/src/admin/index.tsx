@@ -22,7 +22,13 @@ function App(appParams: AppParams) {
 
     useEffect(() => {
         async function fetchApiInfo() {
-            const {json} = await defaultHttpClient(appParams.apiInfoUrl);
+            // Ask for api_info with shared subtrees of fields to reduce its size.
+            // "mode=index" is not used, because routes of all resources must be
+            // registered in <Admin> at once, and the data provider needs
+            // file inputs and pagination type of every resource.
+            const url = new URL(appParams.apiInfoUrl, window.location.href);
+            url.searchParams.set('mode', 'shared');
+            const {json} = await defaultHttpClient(url.toString());
             const apiInfoInstance = new ApiInfo(json);
             setApiInfo(
                 // GOTCHA: apiInfoInstance can be a function
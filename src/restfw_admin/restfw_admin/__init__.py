@@ -59,6 +59,9 @@ def includeme(config: Configurator):
     from .config import add_resource_admin
 
     config.add_directive('add_resource_admin', add_resource_admin)
+    from .config import add_admin_choices
+
+    config.add_directive('add_admin_choices', add_admin_choices)
     from .fields import add_field_converter
 
     config.add_directive('add_field_converter', add_field_converter)
@@ -17,6 +17,7 @@ class AdminChoicesAdmin(ResourceAdmin):
     container_view_class = AdminChoicesView
     child_view_class = AdminChoiceView
     id_field: str = 'uniq_id'
+    cache_vary = ()
 
     @reify
     def location(self):
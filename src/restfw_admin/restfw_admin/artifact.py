@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Offline compiled ``api_info.json``.
+
+Information about resources can be built once by ``admin_compile_api_info``
+console script and written to a file. Set ``restfw_admin.api_info_artifact``
+to the path of this file, and every worker process will serve resources from
+the memory-mapped file instead of building them, while the fingerprint
+of the artifact matches the running registry.
+
+The fingerprint includes source code of modules with resource admins,
+their views and schemas. Set ``restfw_admin.api_info_build_id`` to an ID
+of build of application (e.g. a version or a commit hash) to be sure that
+the artifact is rebuilt after changes in other modules.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import sys
+import tempfile
+from importlib import metadata
+from typing import Dict, Iterable, Optional, Tuple
+
+from pyramid.registry import Registry
+from restfw.typing import PyramidRequest
+
+from .cache import (
+    API_INFO_ARTIFACT_KEY,
+    ARTIFACT_FINGERPRINT_KEY,
+    RESOURCE_VERSIONS_KEY,
+    get_admin_config_version,
+)
+from .interfaces import IResourceAdminFabric
+
+
+ARTIFACT_FORMAT = 2
+
+
+class ApiInfoArtifact:
+    """Memory-mapped file with compiled resources of ``api_info.json``.
+
+    The file consists of a header with meta information in JSON
+    and a new line, followed by already serialized sections:
+
+    - ``resources`` - resources for the default mode of api_info;
+    - ``shared_resources`` and ``shared`` - resources with references
+      and shared subtrees for the "shared" mode of api_info.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = self._mmap.find(b'\n')
+        if header_end < 0:
+            raise ValueError(f'Invalid api_info artifact: {path}')
+        header = json.loads(self._mmap[:header_end])
+        if header.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f'Unsupported format of api_info artifact: {path}')
+        self.fingerprint: str = header['fingerprint']
+        self.content_hash: str = header['content_hash']
+        self.shared_content_hash: str = header['shared_content_hash']
+        # Serialized sections are never copied into memory of process,
+        # so pages of the file are shared between all worker processes.
+        offset = header_end + 1
+        if offset + sum(length for _, length in header['sections']) != len(self._mmap):
+            raise ValueError(f'Invalid api_info artifact: {path}')
+        sections: Dict[str, memoryview] = {}
+        body = memoryview(self._mmap)
+        for name, length in header['sections']:
+            sections[name] = body[offset : offset + length]
+            offset += length
+        self.resources_body = sections['resources']
+        self.shared_resources_body = sections['shared_resources']
+        self.shared_body = sections['shared']
+        self._sections = sections
+
+    def close(self):
+        for section in self._sections.values():
+            section.release()
+        self._mmap.close()
+
+
+def get_registry_fingerprint(registry: Registry) -> str:
+    """Returns a fingerprint of admin configuration of the registry.
+    The artifact is used only if it has the same fingerprint.
+
+    The fingerprint of configuration is calculated once per version
+    of admin configuration and stored in the registry.
+    """
+    config_version = get_admin_config_version(registry)
+    cached: Optional[Tuple[int, str]] = registry.get(ARTIFACT_FINGERPRINT_KEY)
+    if cached is None or cached[0] != config_version:
+        cached = (config_version, _get_config_fingerprint(registry))
+        registry[ARTIFACT_FINGERPRINT_KEY] = cached
+    fingerprint = cached[1]
+    resource_versions = registry.get(RESOURCE_VERSIONS_KEY)
+    if resource_versions:
+        versions = json.dumps(sorted(resource_versions.items()))
+        fingerprint = hashlib.md5(
+            f'{fingerprint}\n{versions}'.encode('utf-8')
+        ).hexdigest()
+    return fingerprint
+
+
+def _get_config_fingerprint(registry: Registry) -> str:
+    try:
+        package_version = metadata.version('restfw_admin')
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        package_version = ''
+    settings = registry.settings or {}
+    fabrics = sorted(registry.getUtilitiesFor(IResourceAdminFabric))
+    parts = {
+        'package_version': package_version,
+        'build_id': settings.get('restfw_admin.api_info_build_id', ''),
+        'config_version': get_admin_config_version(registry),
+        'fabrics': [
+            (name, f'{fabric.__module__}.{fabric.__qualname__}')
+            for name, fabric in fabrics
+        ],
+        'sources': _get_sources_hash(fabric for _, fabric in fabrics),
+    }
+    return hashlib.md5(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def _get_sources_hash(fabrics: Iterable[type]) -> str:
+    """Returns a hash of source code of modules where the given resource
+    admins, their views and schemas (with base classes) are defined."""
+    classes = set()
+    for fabric in fabrics:
+        classes.add(fabric)
+        for name in ('container_view_class', 'child_view_class'):
+            view_class = getattr(fabric, name, None)
+            if view_class is not None:
+                classes.add(view_class)
+        get_schema_classes = getattr(fabric, 'get_schema_classes', None)
+        if get_schema_classes is not None:
+            classes.update(get_schema_classes())
+    module_names = {
+        base.__module__
+        for cls in classes
+        for base in inspect.getmro(cls)
+        if base.__module__ != 'builtins'
+    }
+    content_hash = hashlib.md5()
+    for module_name in sorted(module_names):
+        content_hash.update(module_name.encode('utf-8'))
+        module = sys.modules.get(module_name)
+        try:
+            path = inspect.getsourcefile(module)
+            if path:
+                with open(path, 'rb') as f:
+                    content_hash.update(f.read())
+        except (TypeError, OSError):
+            pass
+    return content_hash.hexdigest()
+
+
+def get_api_info_artifact(registry: Registry) -> Optional[ApiInfoArtifact]:
+    """Returns the artifact specified in ``restfw_admin.api_info_artifact``
+    setting if its fingerprint matches the registry."""
+    settings = registry.settings or {}
+    path = settings.get('restfw_admin.api_info_artifact')
+    if not path:
+        return None
+    artifact = registry.get(API_INFO_ARTIFACT_KEY)
+    if not isinstance(artifact, ApiInfoArtifact):
+        # The artifact may be written after start of the process, so a missing
+        # or broken file is loaded again if its signature has been changed.
+        signature = _get_file_signature(path)
+        if artifact == signature:
+            return None
+        artifact = _load_artifact(path)
+        registry[API_INFO_ARTIFACT_KEY] = artifact or signature
+        if artifact is None:
+            return None
+    if artifact.fingerprint != get_registry_fingerprint(registry):
+        return None
+    return artifact
+
+
+def _get_file_signature(path: str) -> Tuple[int, ...]:
+    """Returns a tuple that is changed with the file,
+    or an empty tuple if the file doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ()
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _load_artifact(path: str) -> Optional[ApiInfoArtifact]:
+    try:
+        return ApiInfoArtifact(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_api_info_artifact(request: PyramidRequest, path: str):
+    """Builds information about all resources and writes it into the file.
+    The file is replaced atomically, so running workers never see
+    a partially written artifact."""
+    from .resources import get_admin
+
+    api_info = get_admin(request.root)['api_info.json']
+    # Existing artifact must not be used as a source of new one
+    compiled = api_info._compile_from_resources(request, index_only=False)
+    shared = api_info._compile_from_resources(
+        request, index_only=False, shared_fields=True
+    )
+    sections = [
+        ('resources', compiled.resources_body.encode('utf-8')),
+        ('shared_resources', shared.resources_body.encode('utf-8')),
+        ('shared', shared.shared_body.encode('utf-8')),
+    ]
+    header = {
+        'format': ARTIFACT_FORMAT,
+        'fingerprint': get_registry_fingerprint(request.registry),
+        'content_hash': compiled.content_hash,
+        'shared_content_hash': shared.content_hash,
+        'sections': [(name, len(body)) for name, body in sections],
+    }
+    dir_name = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8'))
+            f.write(b'\n')
+            for _, body in sections:
+                f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compile information about resource admins of application '
+        'into a file that can be served by all workers '
+        '(see "restfw_admin.api_info_artifact" setting).'
+    )
+    parser.add_argument('config_uri', help='Path to ini file of application.')
+    parser.add_argument(
+        'output',
+        nargs='?',
+        help='Path to output file. By default, the value of '
+        '"restfw_admin.api_info_artifact" setting is used.',
+    )
+    args = parser.parse_args(argv)
+
+    from pyramid.paster import bootstrap, setup_logging
+
+    setup_logging(args.config_uri)
+    with bootstrap(args.config_uri) as env:
+        request = env['request']
+        request.root = env['root']
+        output = args.output or request.registry.settings.get(
+            'restfw_admin.api_info_artifact'
+        )
+        if not output:
+            parser.error('Path to output file is not specified.')
+        write_api_info_artifact(request, output)
+    print(f'api_info is written to {output}', file=sys.stderr)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from pyramid.registry import Registry
+from pyramid.settings import asbool
+from pyramid.threadlocal import manager
+from restfw.typing import PyramidRequest
+
+from .interfaces import IResourceAdminFabric
+
+
+_T = TypeVar('_T')
+_V = TypeVar('_V')
+_I = TypeVar('_I')
+
+CONFIG_VERSION_KEY = 'restfw_admin.config_version'
+RESOURCE_VERSIONS_KEY = 'restfw_admin.resource_versions'
+API_INFO_CACHE_KEY = 'restfw_admin.compiled_api_info'
+RESOURCE_INFO_CACHE_KEY = 'restfw_admin.compiled_resources_info'
+ENCODED_BODIES_CACHE_KEY = 'restfw_admin.encoded_bodies'
+RESOURCE_DEPENDENCIES_KEY = 'restfw_admin.resource_dependencies'
+INDEXED_RESOURCES_KEY = 'restfw_admin.indexed_resources'
+API_INFO_ARTIFACT_KEY = 'restfw_admin.api_info_artifact'
+ARTIFACT_FINGERPRINT_KEY = 'restfw_admin.api_info_artifact_fingerprint'
+WIDGETS_CACHE_KEY = 'restfw_admin.schema_widgets'
+CONVERTERS_CACHE_KEY = 'restfw_admin.field_converters'
+NODE_WIDGETS_CACHE_KEY = 'restfw_admin.node_widgets'
+FIELD_MODELS_CACHE_KEY = 'restfw_admin.field_models'
+# Cached choices are data, not metadata, so they are not dropped
+# with other caches (see invalidate_admin_choices()).
+CHOICES_CACHE_KEY = 'restfw_admin.choices_cache'
+CHOICES_TTL_KEY = 'restfw_admin.choices_ttl'
+# Thread pool is shared by all builds, it is not a cache
+BUILD_EXECUTOR_KEY = 'restfw_admin.build_executor'
+_ALL_KEYS = (
+    API_INFO_CACHE_KEY,
+    RESOURCE_INFO_CACHE_KEY,
+    ENCODED_BODIES_CACHE_KEY,
+    RESOURCE_DEPENDENCIES_KEY,
+    INDEXED_RESOURCES_KEY,
+    WIDGETS_CACHE_KEY,
+    CONVERTERS_CACHE_KEY,
+    NODE_WIDGETS_CACHE_KEY,
+    FIELD_MODELS_CACHE_KEY,
+)
+
+_build_lock = threading.RLock()
+
+
+def is_api_info_cache_enabled(registry: Registry) -> bool:
+    settings = registry.settings or {}
+    return asbool(settings.get('restfw_admin.cache_api_info', True))
+
+
+def get_cache_size(registry: Registry, name: str, default: int) -> int:
+    settings = registry.settings or {}
+    return int(settings.get(name, default))
+
+
+def get_build_workers(registry: Registry) -> int:
+    """Returns number of threads used to build information about
+    resources. Values less than 2 mean sequential building."""
+    settings = registry.settings or {}
+    return int(settings.get('restfw_admin.build_workers', 0))
+
+
+def build_all(
+    request: PyramidRequest, builder: Callable[[_I], _T], items: Sequence[_I]
+) -> List[_T]:
+    """Calls ``builder`` for every item and returns results in the same
+    order as items. Builders are called in a thread pool if it is enabled
+    by ``restfw_admin.build_workers`` setting. The thread pool is created
+    once per registry and reused by all builds.
+    """
+    registry = request.registry
+    workers = get_build_workers(registry)
+    if min(workers, len(items)) < 2:
+        return [builder(item) for item in items]
+
+    def build(item: _I) -> _T:
+        # Some code (e.g. deferred values of schemas) may use
+        # get_current_request() or get_current_registry().
+        manager.push({'request': request, 'registry': request.registry})
+        try:
+            return builder(item)
+        finally:
+            manager.pop()
+
+    executor: ThreadPoolExecutor = get_or_build(
+        registry,
+        BUILD_EXECUTOR_KEY,
+        lambda: ThreadPoolExecutor(workers, thread_name_prefix='restfw_admin'),
+    )
+    return list(executor.map(build, items))
+
+
+def get_or_build(registry: Registry, key: str, builder: Callable[[], _T]) -> _T:
+    """Returns a value stored in the registry under the given key.
+    If the value is absent, it is built by calling of ``builder`` and
+    stored into the registry. Only one thread builds the value at once.
+    """
+    value = registry.get(key)
+    if value is None:
+        with _build_lock:
+            value = registry.get(key)
+            if value is None:
+                value = builder()
+                registry[key] = value
+    return value
+
+
+class LruCache(Generic[_V]):
+    """Thread-safe dictionary with limited size. The least recently used
+    items are removed from it if the size exceeds the limit.
+
+    >>> cache = LruCache(2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> cache.get('b') is None
+    True
+    >>> sorted(cache.keys())
+    ['a', 'c']
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._items: OrderedDict[Hashable, _V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
+
+    def __setitem__(self, key: Hashable, value: _V):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def get(self, key: Hashable, default: Optional[_V] = None) -> Optional[_V]:
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], _V]) -> _V:
+        value = self.get(key)
+        if value is None:
+            value = builder()
+            self[key] = value
+        return value
+
+    def keys(self):
+        with self._lock:
+            return list(self._items.keys())
+
+    def pop(self, key: Hashable, default: Optional[_V] = None) -> Optional[_V]:
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def get_admin_config_version(registry: Registry) -> int:
+    """Returns a monotonically increasing version of admin configuration.
+    It is increased by registration of resource admins, field and validator
+    converters, admin choices and by ``invalidate_admin_caches()``.
+    Any cache of admin metadata must be keyed by this version.
+    """
+    return registry.get(CONFIG_VERSION_KEY, 0)
+
+
+def get_resource_version(registry: Registry, resource: str) -> Tuple[int, int]:
+    """Returns a version of metadata of the given resource admin.
+    It is changed with the version of admin configuration or by
+    ``invalidate_admin_caches(registry, resource)``.
+    """
+    versions: Dict[str, int] = registry.get(RESOURCE_VERSIONS_KEY, {})
+    return get_admin_config_version(registry), versions.get(resource, 0)
+
+
+def add_resource_dependencies(
+    registry: Registry, resource: str, dependencies: Iterable[Hashable]
+):
+    """Remembers that information about the given resource admin was built
+    from the given dependencies (view classes, schema classes, names
+    of choice groups)."""
+    with _build_lock:
+        index: Dict[Hashable, Set[str]] = registry.setdefault(
+            RESOURCE_DEPENDENCIES_KEY, {}
+        )
+        for dependency in dependencies:
+            index.setdefault(dependency, set()).add(resource)
+        indexed: Set[str] = registry.setdefault(INDEXED_RESOURCES_KEY, set())
+        indexed.add(resource)
+
+
+def get_dependent_resources(registry: Registry, dependency: Hashable) -> Set[str]:
+    """Returns names of resource admins which cached information
+    depends on the given view class, schema class or choice group."""
+    with _build_lock:
+        index: Dict[Hashable, Set[str]] = registry.get(RESOURCE_DEPENDENCIES_KEY, {})
+        return set(index.get(dependency, ()))
+
+
+def _all_resources_indexed(registry: Registry) -> bool:
+    indexed: Set[str] = registry.get(INDEXED_RESOURCES_KEY, set())
+    return all(
+        name in indexed for name, _ in registry.getUtilitiesFor(IResourceAdminFabric)
+    )
+
+
+def invalidate_admin_caches(
+    registry: Registry,
+    resource: Optional[str] = None,
+    depends_on: Optional[Hashable] = None,
+):
+    """Drops cached admin metadata.
+
+    If ``resource`` and ``depends_on`` are None - all caches are dropped
+    and the version of admin configuration is increased. Otherwise, only
+    cached information about the given resource admin and about resource
+    admins depending on ``depends_on`` (a view class, a schema class or
+    a name of choice group) is dropped. Cached information about other
+    resource admins is reused to build documents that include them.
+
+    Dependencies are known only for resource admins which information
+    has been built by this process. If some resource admins have not been
+    built (e.g. they are served from the offline compiled artifact),
+    ``depends_on`` can't be resolved, so all caches are dropped.
+    """
+    with _build_lock:
+        if depends_on is not None and not _all_resources_indexed(registry):
+            resource = depends_on = None
+        if resource is None and depends_on is None:
+            registry[CONFIG_VERSION_KEY] = get_admin_config_version(registry) + 1
+            for key in _ALL_KEYS:
+                registry.pop(key, None)
+            return
+
+        resources = set()
+        if resource is not None:
+            resources.add(resource)
+        if depends_on is not None:
+            resources.update(get_dependent_resources(registry, depends_on))
+        if not resources:
+            return
+        versions: Dict[str, int] = registry.setdefault(RESOURCE_VERSIONS_KEY, {})
+        resource_caches = registry.get(RESOURCE_INFO_CACHE_KEY)
+        for name in resources:
+            versions[name] = versions.get(name, 0) + 1
+            if resource_caches:
+                resource_caches.pop(name, None)
+        # Converted widgets are cheap to rebuild and are not tracked
+        # per resource, so they are dropped entirely.
+        for key in (
+            API_INFO_CACHE_KEY,
+            ENCODED_BODIES_CACHE_KEY,
+            WIDGETS_CACHE_KEY,
+            NODE_WIDGETS_CACHE_KEY,
+            FIELD_MODELS_CACHE_KEY,
+        ):
+            registry.pop(key, None)
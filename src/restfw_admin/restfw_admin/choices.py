@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Cache of choices returned by IAdminChoices providers.
+
+Results of a provider are cached per group if a TTL is specified
+for the group on registration (see ``admin_choices_config`` and
+``config.add_admin_choices()``) or by ``restfw_admin.choices_cache_ttl``
+setting. By default, providers are called on every request.
+
+Providers of large groups may have ``lookup()``, ``page()`` and ``count()``
+methods (see ``IAdminChoices``), they are called instead of building
+the full list of choices when it is possible.
+"""
+
+import dataclasses
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    runtime_checkable,
+)
+
+from pyramid.registry import Registry
+
+from .cache import (
+    CHOICES_CACHE_KEY,
+    CHOICES_TTL_KEY,
+    get_or_build,
+    invalidate_admin_caches,
+)
+from .interfaces import IAdminChoices
+
+
+ChoiceItem = Tuple[Any, str]
+ChoicesProvider = Callable[[Registry], List[ChoiceItem]]
+
+
+@runtime_checkable
+class PageableChoicesProvider(Protocol):
+    """Provider of choices that can return a slice of its choices."""
+
+    def __call__(self, registry: Registry) -> List[ChoiceItem]: ...
+
+    def page(self, registry: Registry, offset: int, limit: int) -> List[ChoiceItem]: ...
+
+    def count(self, registry: Registry) -> int: ...
+
+
+# It can be replaced in tests
+_clock = time.monotonic
+
+
+@dataclasses.dataclass()
+class ChoicesCacheStats:
+    """Statistics of the cache of one group of choices."""
+
+    # TTL of cached choices in seconds, None if the group is not cached
+    ttl: Optional[float] = None
+    # Number of requests of choices served from the cache
+    hits: int = 0
+    # Number of calls of the provider
+    misses: int = 0
+    # Number of cached choices
+    size: int = 0
+
+
+@dataclasses.dataclass()
+class _CachedChoices:
+    items: List[ChoiceItem]
+    expires_at: float
+    # Index of choices by string representation of their ids,
+    # it is built on first lookup of a choice.
+    index: Optional[Dict[str, ChoiceItem]] = None
+
+    def get_index(self) -> Dict[str, ChoiceItem]:
+        index = self.index
+        if index is None:
+            # The first choice wins if a provider returns duplicated ids
+            index = {}
+            for item in self.items:
+                index.setdefault(str(item[0]), item)
+            self.index = index
+        return index
+
+
+class ChoicesCache:
+    """Thread-safe cache of choices per group."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _CachedChoices] = {}
+        self._stats: Dict[str, ChoicesCacheStats] = {}
+        # It is increased by invalidation, so choices returned by
+        # a provider called before invalidation are not cached.
+        self._generation = 0
+
+    def get_items(
+        self,
+        registry: Registry,
+        group: str,
+        provider: ChoicesProvider,
+        ttl: Optional[float],
+    ) -> List[ChoiceItem]:
+        return self._get_entry(registry, group, provider, ttl).items
+
+    def get_item(
+        self,
+        registry: Registry,
+        group: str,
+        provider: ChoicesProvider,
+        ttl: Optional[float],
+        choice_id: str,
+    ) -> Optional[ChoiceItem]:
+        """Returns a choice with the given string representation of id."""
+        if not _is_cached(ttl):
+            # Not cached choices are used once, so building
+            # of an index of them is more expensive than a scan.
+            return next(
+                (item for item in provider(registry) if str(item[0]) == choice_id),
+                None,
+            )
+        entry = self._get_entry(registry, group, provider, ttl)
+        return entry.get_index().get(choice_id)
+
+    def _get_entry(
+        self,
+        registry: Registry,
+        group: str,
+        provider: ChoicesProvider,
+        ttl: Optional[float],
+    ) -> _CachedChoices:
+        if not _is_cached(ttl):
+            return _CachedChoices(list(provider(registry)), 0.0)
+        now = _clock()
+        with self._lock:
+            stats = self._get_stats(group, ttl)
+            entry = self._entries.get(group)
+            if entry is not None and entry.expires_at > now:
+                stats.hits += 1
+                return entry
+            stats.misses += 1
+            generation = self._generation
+        # The provider may be slow, so it is called without the lock
+        entry = _CachedChoices(list(provider(registry)), now + ttl)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[group] = entry
+                self._get_stats(group, ttl).size = len(entry.items)
+        return entry
+
+    def invalidate(self, group: Optional[str] = None):
+        with self._lock:
+            self._generation += 1
+            if group is None:
+                self._entries.clear()
+                for stats in self._stats.values():
+                    stats.size = 0
+            else:
+                self._entries.pop(group, None)
+                if group in self._stats:
+                    self._stats[group].size = 0
+
+    def get_stats(self) -> Dict[str, ChoicesCacheStats]:
+        with self._lock:
+            return {
+                group: dataclasses.replace(stats)
+                for group, stats in sorted(self._stats.items())
+            }
+
+    def _get_stats(self, group: str, ttl: Optional[float]) -> ChoicesCacheStats:
+        stats = self._stats.get(group)
+        if stats is None:
+            stats = self._stats[group] = ChoicesCacheStats()
+        stats.ttl = ttl
+        return stats
+
+
+def _is_cached(ttl: Optional[float]) -> bool:
+    return bool(ttl) and ttl > 0
+
+
+def get_choices_cache(registry: Registry) -> ChoicesCache:
+    return get_or_build(registry, CHOICES_CACHE_KEY, ChoicesCache)
+
+
+def get_choices_ttl(registry: Registry, group: str) -> Optional[float]:
+    """Returns TTL of cached choices of the group in seconds."""
+    ttls: Dict[str, Optional[float]] = registry.get(CHOICES_TTL_KEY, {})
+    ttl = ttls.get(group)
+    if ttl is None:
+        settings = registry.settings or {}
+        ttl = settings.get('restfw_admin.choices_cache_ttl')
+    return float(ttl) if ttl else None
+
+
+def get_group_choices(registry: Registry, group: str) -> List[ChoiceItem]:
+    """Returns list of tuples (id, name) of choices of the group.
+    Returned list is shared with the cache and must not be modified."""
+    provider = registry.queryUtility(IAdminChoices, name=group)
+    if provider is None:
+        return []
+    return get_choices_cache(registry).get_items(
+        registry, group, provider, get_choices_ttl(registry, group)
+    )
+
+
+def get_group_choice(
+    registry: Registry, group: str, choice_id: str
+) -> Optional[ChoiceItem]:
+    """Returns a tuple (id, name) of the choice of the group which id
+    converted to string is equal to ``choice_id``. Only the provider
+    of the given group is called."""
+    provider = registry.queryUtility(IAdminChoices, name=group)
+    if provider is None:
+        return None
+    lookup = getattr(provider, 'lookup', None)
+    if lookup is not None:
+        for item in lookup(registry, [choice_id]):
+            if str(item[0]) == choice_id:
+                return item
+        return None
+    return get_choices_cache(registry).get_item(
+        registry, group, provider, get_choices_ttl(registry, group), choice_id
+    )
+
+
+def get_group_choices_by_ids(
+    registry: Registry, group: str, choice_ids: Sequence[str]
+) -> List[ChoiceItem]:
+    """Returns list of tuples (id, name) of choices of the group
+    with the given ids. The ``lookup()`` method of the provider is used
+    if it exists."""
+    provider = registry.queryUtility(IAdminChoices, name=group)
+    if provider is None:
+        return []
+    lookup = getattr(provider, 'lookup', None)
+    if lookup is not None:
+        return list(lookup(registry, list(choice_ids)))
+    ids = set(choice_ids)
+    return [item for item in get_group_choices(registry, group) if item[0] in ids]
+
+
+def get_pageable_provider(
+    registry: Registry, group: str
+) -> Optional[PageableChoicesProvider]:
+    """Returns the provider of choices of the group if it has
+    ``page()`` and ``count()`` methods."""
+    provider = registry.queryUtility(IAdminChoices, name=group)
+    if isinstance(provider, PageableChoicesProvider):
+        return provider
+    return None
+
+
+def register_admin_choices(
+    registry: Registry,
+    name: str,
+    provider: ChoicesProvider,
+    ttl: Optional[float] = None,
+):
+    """Registers a provider of choices for the group with the given name.
+    If ``ttl`` is specified, results of the provider are cached
+    for ``ttl`` seconds."""
+    registry.registerUtility(provider, IAdminChoices, name=name)
+    ttls: Dict[str, Optional[float]] = registry.setdefault(CHOICES_TTL_KEY, {})
+    ttls[name] = ttl
+    invalidate_admin_choices(registry, name)
+    invalidate_admin_caches(registry)
+
+
+def invalidate_admin_choices(registry: Registry, group: Optional[str] = None):
+    """Drops cached choices of the given group or of all groups."""
+    cache: Optional[ChoicesCache] = registry.get(CHOICES_CACHE_KEY)
+    if cache is not None:
+        cache.invalidate(group)
+
+
+def get_choices_cache_stats(registry: Registry) -> Dict[str, ChoicesCacheStats]:
+    """Returns statistics of cached choices by groups."""
+    return get_choices_cache(registry).get_stats()
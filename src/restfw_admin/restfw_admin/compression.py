@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import gzip
+from typing import Callable, Optional, Tuple
+
+from pyramid.registry import Registry
+from pyramid.settings import asbool
+from restfw.typing import PyramidRequest
+
+from .cache import (
+    ENCODED_BODIES_CACHE_KEY,
+    LruCache,
+    get_cache_size,
+    get_or_build,
+)
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def get_supported_encodings() -> Tuple[str, ...]:
+    """Returns content-codings supported by server in order of preference."""
+    if brotli is not None:
+        return 'br', 'gzip'
+    return ('gzip',)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        # mtime=0 makes result reproducible
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=9)
+    raise ValueError(f'Unsupported content-coding: {encoding}')
+
+
+def is_compression_enabled(registry: Registry) -> bool:
+    settings = registry.settings or {}
+    return asbool(settings.get('restfw_admin.compress_api_info', True))
+
+
+def get_best_encoding(request: PyramidRequest) -> Optional[str]:
+    """Returns the best content-coding acceptable by client or None
+    if body must be sent as is."""
+    if not request.accept_encoding or not is_compression_enabled(request.registry):
+        return None
+    offers = request.accept_encoding.acceptable_offers(get_supported_encodings())
+    if offers:
+        return offers[0][0]
+    return None
+
+
+def get_encoded_body(
+    registry: Registry,
+    version: str,
+    encoding: str,
+    get_body: Callable[[], bytes],
+) -> bytes:
+    """Returns compressed body from cache. Cache is keyed by version of
+    the body (usually ETag), so the body is compressed only once.
+    """
+    cache: LruCache[bytes] = get_or_build(
+        registry, ENCODED_BODIES_CACHE_KEY, lambda: _create_cache(registry)
+    )
+    return cache.get_or_build(
+        (version, encoding), lambda: compress(get_body(), encoding)
+    )
+
+
+def _create_cache(registry: Registry) -> LruCache[bytes]:
+    return LruCache(get_cache_size(registry, 'restfw_admin.compressed_cache_size', 16))
@@ -13,7 +13,8 @@ from pyramid.registry import Registry
 from restfw.typing import SimpleJsonValue
 
 from . import interfaces
-from .interfaces import IAdminChoices
+from .cache import invalidate_admin_caches
+from .choices import ChoicesProvider, register_admin_choices
 from .resource_admin import ResourceAdmin
 
 
@@ -31,6 +32,12 @@ class admin_choices_config(object):
                 ('family_storage', 'Family Storage'),
             ]
 
+    Results of the function are cached for ``ttl`` seconds if it is specified::
+
+        @admin_choices_config('product_types', ttl=60)
+        def get_product_types(request):
+            ...
+
     Two additional keyword arguments which will be passed to the
     :term:`venusian` ``attach`` function are ``_depth`` and ``_category``.
 
@@ -56,16 +63,15 @@ class admin_choices_config(object):
 
     venusian = venusian  # for testing injection
 
-    def __init__(self, name=None, **kwargs):
+    def __init__(self, name=None, ttl: Optional[float] = None, **kwargs):
         self.name = name
+        self.ttl = ttl
         self.depth = kwargs.pop('_depth', 0)
         self.category = kwargs.pop('_category', 'pyramid')
 
     def register(self, scanner, name, wrapped):
         config = scanner.config
-        factory = wrapped
-
-        config.registry.registerUtility(factory, IAdminChoices, name=self.name)
+        register_admin_choices(config.registry, self.name, wrapped, ttl=self.ttl)
 
     def __call__(self, wrapped):
         if not self.name:
@@ -96,11 +102,39 @@ def add_resource_admin(
             provided=interfaces.IResourceAdminFabric,
             name=name,
         )
+        invalidate_admin_caches(config.registry)
 
     config.action(None, register, introspectables=(intr,))
     return fabric
 
 
+def add_admin_choices(
+    config: Configurator,
+    provider: Union[ChoicesProvider, str],
+    name: str,
+    ttl: Optional[float] = None,
+):
+    """Registers a provider of choices for the group with the given name.
+    Results of the provider are cached for ``ttl`` seconds
+    if it is specified."""
+    provider = config.maybe_dotted(provider)
+
+    intr = config.introspectable(
+        category_name='restfw_admin_choices',
+        discriminator=name,
+        title=config.object_description(provider),
+        type_name='restfw_admin_choices',
+    )
+    intr['provider'] = provider
+    intr['ttl'] = ttl
+
+    def register():
+        register_admin_choices(config.registry, name, provider, ttl=ttl)
+
+    config.action(None, register, introspectables=(intr,))
+    return provider
+
+
 class resource_admin_config(object):
     """A function, class or method :term:`decorator` which allows a
     developer to create resource admin config registrations nearer to it
@@ -4,9 +4,20 @@
 :Date: 25.04.2020
 """
 
-import copy
+import contextvars
+import weakref
 from functools import partial
-from typing import Callable, Dict, Optional, Type
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import colander
 import venusian
@@ -14,6 +25,17 @@ from pyramid.config import Configurator
 from pyramid.registry import Registry
 
 from . import interfaces
+from .cache import (
+    CONVERTERS_CACHE_KEY,
+    FIELD_MODELS_CACHE_KEY,
+    NODE_WIDGETS_CACHE_KEY,
+    WIDGETS_CACHE_KEY,
+    get_admin_config_version,
+    get_or_build,
+    invalidate_admin_caches,
+)
+from .models import FieldModel
+from .serializer import prerender
 from .typing import ColanderNode
 from .utils import slug_to_title
 from .validators import Choices, Required
@@ -21,6 +43,7 @@ from .validators_converters import get_validators, get_validators_by_type
 from .widgets import (
     FieldWidget,
     InputWidget,
+    Widget,
     SelectField,
     SelectInput,
     WidgetOptions,
@@ -55,15 +78,305 @@ def get_input_widgets(registry: Registry, schema: ColanderNode):
     return widgets
 
 
+def get_schema_widgets(
+    registry: Registry,
+    schema: ColanderNode,
+    fields_type: Literal['view', 'input'],
+    schema_class: Optional[Type[ColanderNode]] = None,
+    path: Tuple[Hashable, ...] = (),
+) -> Dict[str, Union[FieldWidget, InputWidget]]:
+    """Returns widgets for children of the given schema node.
+
+    If the node is an instance of ``schema_class`` (or its sub-node
+    with given ``path``) and ``schema_class`` doesn't have deferred values,
+    converted widgets are cached by schema class, path, type of fields
+    and version of admin configuration. So converters are not called
+    for the same schema again.
+    """
+    if fields_type == 'input':
+        get_widgets = get_input_widgets
+    else:
+        get_widgets = get_field_widgets
+    if schema_class is None or not is_static_schema(schema_class):
+        return get_widgets(registry, schema)
+    cache: Dict[Hashable, Dict[str, Union[FieldWidget, InputWidget]]] = get_or_build(
+        registry, WIDGETS_CACHE_KEY, dict
+    )
+    key = (schema_class, path, fields_type, get_admin_config_version(registry))
+    widgets = cache.get(key)
+    if widgets is None:
+        widgets = cache.setdefault(key, get_widgets(registry, schema))
+    # Widgets are immutable, but callers may modify the dictionary
+    return widgets.copy()
+
+
+_static_schemas: 'weakref.WeakKeyDictionary[type, bool]' = weakref.WeakKeyDictionary()
+_static_nodes: 'weakref.WeakKeyDictionary[ColanderNode, bool]' = (
+    weakref.WeakKeyDictionary()
+)
+# Bound clones of static nodes and their original unbound nodes
+_node_origins: 'weakref.WeakKeyDictionary[ColanderNode, ColanderNode]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def is_static_schema(schema_class: Type[ColanderNode]) -> bool:
+    """Returns True if the schema doesn't have deferred values
+    and ``after_bind`` callbacks, so the result of its binding
+    doesn't depend on a request."""
+    is_static = _static_schemas.get(schema_class)
+    if is_static is None:
+        is_static = is_static_node(schema_class())
+        _static_schemas[schema_class] = is_static
+    return is_static
+
+
+def is_static_node(node: ColanderNode) -> bool:
+    """Returns True if the node and its sub-nodes don't have deferred
+    values and ``after_bind`` callbacks."""
+    is_static = _static_nodes.get(node)
+    if is_static is not None:
+        return is_static
+    # Sub-nodes are checked before their parents without recursion
+    stack = [(node, False)]
+    while stack:
+        current, children_are_checked = stack.pop()
+        if current in _static_nodes:
+            continue
+        if children_are_checked:
+            _static_nodes[current] = not _is_dynamic_node(current) and all(
+                _static_nodes[child] for child in current.children
+            )
+        else:
+            stack.append((current, True))
+            stack.extend((child, False) for child in current.children)
+    return _static_nodes[node]
+
+
+def _is_dynamic_node(node: ColanderNode) -> bool:
+    """Returns True if the node itself has deferred values
+    or ``after_bind`` callback."""
+    if getattr(node, 'after_bind', None):
+        return True
+    for name in dir(node):
+        if isinstance(getattr(node, name, None), colander.deferred):
+            return True
+    return False
+
+
+def bind_partially(schema: ColanderNode, **kw) -> ColanderNode:
+    """Returns a clone of the schema bound with given values.
+
+    Like ``schema.bind()``, every node is cloned and gets ``bindings``,
+    so the original schema and its sub-nodes shared with other schemas
+    are never modified. But deferred values are resolved only in nodes
+    having them. Clones of static nodes remember their original nodes,
+    so widgets converted from them are cached for original nodes and
+    reused for every request.
+    """
+    bound = None
+    # Nodes are cloned without recursion
+    stack: List[Tuple[ColanderNode, Optional[ColanderNode]]] = [(schema, None)]
+    while stack:
+        node, parent = stack.pop()
+        if _is_dynamic_node(node):
+            cloned = node.bind(**kw)
+        else:
+            cloned = object.__new__(node.__class__)
+            cloned.__dict__.update(node.__dict__)
+            cloned.bindings = kw
+            cloned.children = []
+            if is_static_node(node):
+                _node_origins[cloned] = _node_origins.get(node, node)
+            stack.extend((child, cloned) for child in reversed(node.children))
+        if parent is None:
+            bound = cloned
+        else:
+            parent.children.append(cloned)
+    return bound
+
+
+def _get_node_origin(node: ColanderNode) -> Optional[ColanderNode]:
+    """Returns an unbound static node which widget is the same as
+    the widget of the given node, or None if the widget of the node
+    can't be cached."""
+    origin = _node_origins.get(node)
+    if origin is None and node.bindings is None and is_static_node(node):
+        origin = node
+    return origin
+
+
+_NOT_CACHED = object()
+
+
+def _get_cached_widget(
+    registry: Registry,
+    node: ColanderNode,
+    fields_type: Literal['view', 'input'],
+    convert: Optional[Callable[[Registry, ColanderNode], Optional[Widget]]] = None,
+) -> Optional[Widget]:
+    """Returns a widget converted from the node. Widgets of static nodes
+    are cached for their original unbound nodes (see ``bind_partially()``),
+    because these nodes are shared between schemas and requests.
+
+    If ``convert`` is None, returns ``_NOT_CACHED`` instead of
+    converting a node that is absent in the cache.
+    """
+    origin = _get_node_origin(node)
+    if origin is None:
+        return _NOT_CACHED if convert is None else convert(registry, node)
+    caches: 'weakref.WeakKeyDictionary[ColanderNode, dict]' = get_or_build(
+        registry, NODE_WIDGETS_CACHE_KEY, weakref.WeakKeyDictionary
+    )
+    cache = caches.get(origin)
+    if cache is None:
+        cache = caches.setdefault(origin, {})
+    key = (fields_type, get_admin_config_version(registry))
+    try:
+        return cache[key]
+    except KeyError:
+        if convert is None:
+            return _NOT_CACHED
+        widget = cache[key] = convert(registry, node)
+        if widget is not None:
+            # Cached widgets are stable, so models of them can be cached too
+            _add_stable_widget(registry, origin, widget)
+        return widget
+
+
+_StableWidgets = Dict[int, Tuple[Widget, Dict[Optional[str], FieldModel]]]
+
+
+def _add_stable_widget(registry: Registry, origin: ColanderNode, widget: Widget):
+    stable_widgets: _StableWidgets = get_or_build(
+        registry, FIELD_MODELS_CACHE_KEY, dict
+    )
+    key = id(widget)
+    if key not in stable_widgets:
+        stable_widgets[key] = (widget, {})
+        # Cached models are dropped together with the node of widget
+        weakref.finalize(
+            origin,
+            _drop_stable_widget,
+            weakref.ref(registry),
+            get_admin_config_version(registry),
+            key,
+        )
+
+
+def _drop_stable_widget(
+    registry_ref: 'weakref.ref[Registry]', config_version: int, key: int
+):
+    registry = registry_ref()
+    # IDs of widgets may be reused after invalidation of caches
+    if registry is None or get_admin_config_version(registry) != config_version:
+        return
+    stable_widgets: Optional[_StableWidgets] = registry.get(FIELD_MODELS_CACHE_KEY)
+    if stable_widgets:
+        stable_widgets.pop(key, None)
+
+
+def get_field_model(
+    registry: Registry, widget: Widget, field_name: Optional[str]
+) -> FieldModel:
+    """Returns a model of the widget.
+
+    Models of widgets converted from static schema nodes never change,
+    so they are cached together with pre-rendered JSON. Such models are
+    shared and must not be modified.
+    """
+    stable_widgets: Optional[_StableWidgets] = registry.get(FIELD_MODELS_CACHE_KEY)
+    entry = stable_widgets.get(id(widget)) if stable_widgets else None
+    if entry is None or entry[0] is not widget:
+        return widget.to_model(field_name)
+    models = entry[1]
+    model = models.get(field_name)
+    if model is None:
+        model = models.setdefault(field_name, prerender(widget.to_model(field_name)))
+    return model
+
+
+# Widgets of sub-nodes converted by the current call of _convert_tree()
+_converted_widgets: contextvars.ContextVar[
+    Optional[Dict[Tuple[int, str], Tuple[ColanderNode, Optional[Widget]]]]
+] = contextvars.ContextVar('restfw_admin_converted_widgets', default=None)
+
+
+def _get_widget(
+    registry: Registry,
+    node: ColanderNode,
+    fields_type: Literal['view', 'input'],
+    convert: Callable[[Registry, ColanderNode], Optional[Widget]],
+) -> Optional[Widget]:
+    memo = _converted_widgets.get()
+    if memo is not None:
+        converted = memo.get((id(node), fields_type))
+        if converted is not None:
+            return converted[1]
+    if not node.children:
+        return _get_cached_widget(registry, node, fields_type, convert)
+    if memo is not None:
+        return _convert_tree(registry, node, fields_type, convert, memo)
+    memo = {}
+    token = _converted_widgets.set(memo)
+    try:
+        return _convert_tree(registry, node, fields_type, convert, memo)
+    finally:
+        _converted_widgets.reset(token)
+
+
+def _convert_tree(
+    registry: Registry,
+    node: ColanderNode,
+    fields_type: Literal['view', 'input'],
+    convert: Callable[[Registry, ColanderNode], Optional[Widget]],
+    memo: Dict[Tuple[int, str], Tuple[ColanderNode, Optional[Widget]]],
+) -> Optional[Widget]:
+    """Converts the node and its sub-nodes into widgets.
+
+    Nodes are traversed with an explicit stack, sub-nodes are converted
+    before their parents. Converters of parents (mappings, sequences, etc.)
+    take widgets of sub-nodes from the memo, so the depth of recursion
+    doesn't depend on the depth of schema.
+    """
+    stack = [(node, False)]
+    while stack:
+        current, children_are_converted = stack.pop()
+        key = (id(current), fields_type)
+        if key in memo:
+            continue
+        if not children_are_converted and current.children:
+            widget = _get_cached_widget(registry, current, fields_type)
+            if widget is _NOT_CACHED:
+                stack.append((current, True))
+                stack.extend((child, False) for child in reversed(current.children))
+                continue
+        else:
+            widget = _get_cached_widget(registry, current, fields_type, convert)
+        # The node is stored to keep it (and its id) alive
+        memo[key] = (current, widget)
+    return memo[(id(node), fields_type)][1]
+
+
 def get_field_widget(
     registry: Registry,
     node: ColanderNode,
     node_type: Optional[colander.SchemaType] = None,
+) -> Optional[FieldWidget]:
+    if node_type is None:
+        return _get_widget(registry, node, 'view', _convert_to_field_widget)
+    return _convert_to_field_widget(registry, node, node_type)
+
+
+def _convert_to_field_widget(
+    registry: Registry,
+    node: ColanderNode,
+    node_type: Optional[colander.SchemaType] = None,
 ) -> Optional[FieldWidget]:
     widget = None
     node_type = node_type or node.typ
-    converter: Optional[FieldConverter] = registry.queryAdapter(
-        node_type, interfaces.ISchemaNodeToFieldWidget
+    converter: Optional[FieldConverter] = get_converter(
+        registry, node_type, interfaces.ISchemaNodeToFieldWidget
     )
     if converter:
         widget = converter(registry, node, node_type)
@@ -75,9 +388,8 @@ def get_field_widget(
         user_widget: FieldWidget
         for user_widget in user_widgets:
             if isinstance(user_widget, FieldWidget):
-                user_widget = copy.deepcopy(user_widget)
                 if widget and not user_widget.label:
-                    user_widget.label = widget.label
+                    user_widget = user_widget.replace(label=widget.label)
                 widget = user_widget
                 break
 
@@ -90,11 +402,21 @@ def get_input_widget(
     registry: Registry,
     node: ColanderNode,
     node_type: Optional[colander.SchemaType] = None,
+) -> Optional[InputWidget]:
+    if node_type is None:
+        return _get_widget(registry, node, 'input', _convert_to_input_widget)
+    return _convert_to_input_widget(registry, node, node_type)
+
+
+def _convert_to_input_widget(
+    registry: Registry,
+    node: ColanderNode,
+    node_type: Optional[colander.SchemaType] = None,
 ) -> Optional[InputWidget]:
     widget = None
     node_type = node_type or node.typ
-    converter: Optional[InputConverter] = registry.queryAdapter(
-        node_type, interfaces.ISchemaNodeToInputWidget
+    converter: Optional[InputConverter] = get_converter(
+        registry, node_type, interfaces.ISchemaNodeToInputWidget
     )
     if converter:
         widget = converter(registry, node, node_type)
@@ -106,7 +428,7 @@ def get_input_widget(
                 colander.required,
             )
         ):
-            widget.default_value = node.missing
+            widget = widget.replace(default_value=node.missing)
 
     if user_widgets := node.widget:
         # Try to find input widget in widgets from colander's node
@@ -115,13 +437,15 @@ def get_input_widget(
         user_widget: InputWidget
         for user_widget in user_widgets:
             if isinstance(user_widget, InputWidget):
-                user_widget = copy.deepcopy(user_widget)
                 if widget:
-                    for name in ('label', 'helper_text', 'default_value'):
-                        if not getattr(user_widget, name):
-                            setattr(user_widget, name, getattr(widget, name))
+                    changes = {
+                        name: getattr(widget, name)
+                        for name in ('label', 'helper_text', 'default_value')
+                        if not getattr(user_widget, name)
+                    }
                     if user_widget.validators is None:
-                        user_widget.validators = widget.validators
+                        changes['validators'] = widget.validators
+                    user_widget = user_widget.replace(**changes)
                 widget = user_widget
                 break
 
@@ -130,6 +454,28 @@ def get_input_widget(
     return widget
 
 
+def get_converter(
+    registry: Registry, node_type: colander.SchemaType, provided
+) -> Optional[Union[FieldConverter, InputConverter]]:
+    """Returns a converter registered for the class of given schema type
+    (or for the nearest its base class).
+
+    Converters are resolved through the adapter registry once per class
+    of schema type and stored in a dispatch table. The table is dropped
+    when a new converter is registered.
+    """
+    table: Dict[tuple, Optional[Union[FieldConverter, InputConverter]]] = get_or_build(
+        registry, CONVERTERS_CACHE_KEY, dict
+    )
+    key = (node_type.__class__, provided)
+    try:
+        return table[key]
+    except KeyError:
+        converter = registry.queryAdapter(node_type, provided)
+        table[key] = converter
+        return converter
+
+
 def _try_convert_to_select_field(
     registry: Registry, widget: FieldWidget, node: ColanderNode
 ) -> FieldWidget:
@@ -206,6 +552,7 @@ def add_field_converter(
             [node_type],
             provided=provided,
         )
+        invalidate_admin_caches(config.registry)
 
     config.action(discriminator, register, introspectables=(intr,))
     return converter
@@ -86,9 +86,10 @@ def string_input(registry: Registry, node: ColanderNode, node_type: colander.Str
         validators=get_validators(registry, node),
     )
     if not node_type.allow_empty:
-        for validator in field.validators:
+        # Converted validators are shared, so they are replaced, not modified
+        for i, validator in enumerate(field.validators):
             if isinstance(validator, MinLength):
-                validator.min = max(validator.min, 1)
+                field.validators[i] = MinLength(max(validator.min, 1))
                 break
         else:
             field.validators.append(MinLength(1))
@@ -155,13 +156,15 @@ def nullable_input(registry: Registry, node: ColanderNode, node_type: schemas.Nu
         elif isinstance(widget, widgets.TextInput):
             widget = widgets.NullableTextInput(**widget.get_fields())
         else:
+            changes = {}
             if isinstance(widget, widgets.SelectInput):
-                widget.empty_text = '<none>'
-                widget.empty_value = None
+                changes['empty_text'] = '<none>'
+                changes['empty_value'] = None
             if widget.validators:
-                widget.validators = [
+                changes['validators'] = [
                     v for v in widget.validators if not isinstance(v, Required)
                 ]
+            widget = widget.replace(**changes)
     return widget
 
 
@@ -19,6 +19,19 @@ from .widgets import FieldWidget, InputWidget
 class IAdminChoices(Interface):
     """Interface of utility to get list of tuples (id, name)
     with choices for some filed in admin UI.
+
+    Providers of large groups of choices may additionally have
+    the following methods to avoid building of the full list
+    of choices for every request:
+
+    - ``lookup(registry, ids)`` - returns list of tuples (id, name)
+      of choices with the given ids (strings);
+    - ``page(registry, offset, limit)`` - returns list of tuples (id, name)
+      of choices from the given slice of all choices;
+    - ``count(registry)`` - returns total number of choices.
+
+    ``page()`` is used only together with ``count()``.
+    Results of these methods are not cached.
     """
 
     def __call__(registry):
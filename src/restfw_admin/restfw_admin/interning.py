@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Structural sharing of repeated subtrees of models.
+
+Resources often contain the same nested fields (address, audit info, etc.)
+and the same lists of choices. ``intern_models()`` serializes such subtrees
+once into a shared section, every occurrence of them is replaced by
+a reference ``{"$ref": "<id>"}``.
+"""
+
+import dataclasses
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .models import FieldModel
+from .serializer import RawJson, dumps, get_serialized_fields
+
+
+__all__ = [
+    'REF_KEY',
+    'intern_models',
+]
+
+
+REF_KEY = '$ref'
+
+# Control characters are always escaped inside of JSON strings,
+# so they can't appear in serialized values outside of placeholders.
+_PLACEHOLDER_MARK = '\x00'
+
+
+def intern_models(value: Any, min_length: int = 64) -> Tuple[str, str]:
+    """Serializes the value into JSON and returns it together with
+    serialized shared section.
+
+    Subtrees of fields and lists of fields or choices that occur
+    more than once and whose JSON is not shorter than ``min_length``
+    are placed into the shared section.
+
+    >>> field = FieldModel('TextField', 'city', {'label': 'City'})
+    >>> address = FieldModel('MappingField', 'address', {'fields': [field]})
+    >>> body, shared = intern_models({'home': [address], 'work': [address]})
+    >>> body
+    '{"home":{"$ref":"0"},"work":{"$ref":"0"}}'
+    >>> shared
+    '{"0":[{"type":"MappingField","source":"address","params":{"fields":[{"type":"TextField","source":"city","params":{"label":"City"},"validators":[],"id":"city"}]},"validators":[],"id":"address"}]}'
+    """
+    interner = _Interner()
+    root = interner.get_template(interner.canonize(value))
+    return interner.render(root, min_length)
+
+
+_Template = List[Union[str, int]]
+
+
+class _Interner:
+    """Replaces subtrees by placeholders with numbers of unique subtrees.
+    Identical subtrees have the same number, so every unique subtree
+    is serialized once."""
+
+    def __init__(self):
+        self._numbers: Dict[str, int] = {}
+        self._templates: List[_Template] = []
+
+    def canonize(self, value: Any) -> Any:
+        # Sub-values are canonized before their parents with an explicit
+        # stack, so the depth of value is not limited by the recursion limit.
+        # Items of the stack: (value, target, key in target, canonized value),
+        # the canonized value is None until sub-values are canonized.
+        root: List[Any] = [None]
+        stack: List[Tuple[Any, Any, Any, Any]] = [(value, root, 0, None)]
+        while stack:
+            value, target, key, result = stack.pop()
+            if result is not None:
+                target[key] = self._finish(value, result)
+                continue
+            cls = value.__class__
+            if cls is list or cls is tuple:
+                result = [None] * len(value)
+                items = list(enumerate(value))
+            elif cls is dict:
+                result = dict.fromkeys(value)
+                items = list(value.items())
+            elif dataclasses.is_dataclass(cls):
+                names = get_serialized_fields(cls)
+                result = dict.fromkeys(names)
+                items = [(name, getattr(value, name)) for name in names]
+            else:
+                target[key] = value
+                continue
+            stack.append((value, target, key, result))
+            for item_key, item in reversed(items):
+                stack.append((item, result, item_key, None))
+        return root[0]
+
+    def _finish(self, value: Any, result: Any) -> Any:
+        """Interns the canonized value if it is a field or a list of fields
+        or choices."""
+        if isinstance(value, FieldModel):
+            return self._intern(result)
+        if (
+            result.__class__ is list
+            and result
+            and all(isinstance(item, (FieldModel, dict)) for item in value)
+        ):
+            return self._intern(result)
+        return result
+
+    def _intern(self, value: Any) -> RawJson:
+        text = dumps(value)
+        number = self._numbers.get(text)
+        if number is None:
+            number = self._numbers[text] = len(self._templates)
+            self._templates.append(self.get_template(value, text))
+        return RawJson(f'{_PLACEHOLDER_MARK}{number}{_PLACEHOLDER_MARK}')
+
+    @staticmethod
+    def get_template(value: Any, text: Optional[str] = None) -> _Template:
+        """Splits serialized value into parts of text and numbers
+        of subtrees."""
+        if text is None:
+            text = dumps(value)
+        parts: _Template = text.split(_PLACEHOLDER_MARK)
+        for i in range(1, len(parts), 2):
+            parts[i] = int(parts[i])
+        return parts
+
+    def render(self, root: _Template, min_length: int) -> Tuple[str, str]:
+        templates = self._templates
+        counts = [0] * len(templates)
+        # Subtrees nested into the repeated subtree are counted once,
+        # because they will be serialized once inside of the shared subtree.
+        stack = list(root[1::2])
+        while stack:
+            number = stack.pop()
+            counts[number] += 1
+            if counts[number] == 1:
+                stack.extend(templates[number][1::2])
+
+        # Lengths of fully expanded subtrees. Nested subtrees are always
+        # interned before their parents, so they have lower numbers.
+        lengths: List[int] = []
+        for template in templates:
+            lengths.append(
+                sum(len(part) for part in template[::2])
+                + sum(lengths[number] for number in template[1::2])
+            )
+        ref_ids: Dict[int, str] = {}
+        shared: Dict[str, RawJson] = {}
+
+        # Templates are rendered with an explicit stack, so the depth
+        # of subtrees is not limited by the recursion limit.
+        # Items of the stack: (parts of template, output, ID of shared subtree).
+        out: List[str] = []
+        stack: List[Tuple[Iterator, List[str], Optional[str]]] = [
+            (iter(enumerate(root)), out, None)
+        ]
+        while stack:
+            parts, part_out, shared_id = stack[-1]
+            for i, part in parts:
+                if i % 2 == 0:
+                    part_out.append(part)
+                    continue
+                if counts[part] < 2 or lengths[part] < min_length:
+                    stack.append((iter(enumerate(templates[part])), part_out, None))
+                    break
+                ref_id = ref_ids.get(part)
+                is_new = ref_id is None
+                if is_new:
+                    ref_id = ref_ids[part] = str(len(ref_ids))
+                    shared[ref_id] = RawJson('')
+                part_out.append(f'{{"{REF_KEY}":"{ref_id}"}}')
+                if is_new:
+                    stack.append((iter(enumerate(templates[part])), [], ref_id))
+                    break
+            else:
+                stack.pop()
+                if shared_id is not None:
+                    shared[shared_id].text = ''.join(part_out)
+        return ''.join(out), dumps(shared)
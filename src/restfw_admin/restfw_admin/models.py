@@ -11,51 +11,62 @@ from typing import Dict, List, Optional, Tuple, TypeVar, Union, Any, Literal
 
 from restfw.typing import Json, SimpleJsonValue
 
+from .serializer import RAW_JSON_FIELD
+
 
 _DEFAULT = object()
 
 
-@dataclass()
+@dataclass(slots=True)
 class ValidatorModel:
     name: str
     args: Tuple[Json, ...] = field(default_factory=tuple)
 
 
-@dataclass()
+@dataclass(slots=True)
 class FieldModel:
     type: str
     source: Optional[str]
     params: Dict[str, Union[Json, 'FieldModel']] = field(default_factory=dict)
     validators: List[ValidatorModel] = field(default_factory=list)
     id: Optional[str] = _DEFAULT
+    # Pre-rendered JSON of the model, it is not serialized itself.
+    # Models with pre-rendered JSON are shared and must not be modified.
+    fragment: Optional[str] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+        metadata={RAW_JSON_FIELD: True},
+    )
 
     def __post_init__(self):
         if self.id is _DEFAULT:
             self.id = self.source or None
 
 
-@dataclass()
+@dataclass(slots=True)
 class ViewModel:
     fields: List[FieldModel]
 
 
-@dataclass()
+@dataclass(slots=True)
 class ListViewModel(ViewModel):
     filters: Optional[List[FieldModel]] = None
     infinite_pagination: bool = False
 
 
 class ShowViewModel(ViewModel):
-    pass
+    __slots__ = ()
 
 
-@dataclass()
+@dataclass(slots=True)
 class CreateViewModel(ViewModel):
     redirect: Literal['list', 'edit', 'show', 'create'] = 'edit'
 
 
 class EditViewModel(ViewModel):
-    pass
+    __slots__ = ()
 
 
 ViewModelType = TypeVar(
@@ -63,7 +74,7 @@ ViewModelType = TypeVar(
 )
 
 
-@dataclass()
+@dataclass(slots=True)
 class ViewsModel:
     list: Optional[ListViewModel] = None
     show: Optional[ShowViewModel] = None
@@ -71,7 +82,7 @@ class ViewsModel:
     edit: Optional[EditViewModel] = None
 
 
-@dataclass()
+@dataclass(slots=True)
 class ResourceInfoModel:
     index: int
     name: str
@@ -86,9 +97,29 @@ class ResourceInfoModel:
     extra: dict[str, Any]
 
 
-@dataclass()
+@dataclass(slots=True)
+class ResourceIndexModel:
+    """Short information about resource without views."""
+
+    index: int
+    name: str
+    title: str
+    location: str
+    id_field: str
+    embedded_name: str
+    update_method: str
+    deletable: bool
+    order_by: list[str]
+    extra: dict[str, Any]
+    # Resource has a list view and must be shown in the menu
+    has_list_view: bool = False
+    # Location of full information about resource relative to root_url
+    info_location: str = ''
+
+
+@dataclass(slots=True)
 class ApiInfoModel:
     root_url: str
     title: str
-    resources: Dict[str, ResourceInfoModel]
+    resources: Dict[str, Union[ResourceInfoModel, ResourceIndexModel]]
     extra: Dict[str, SimpleJsonValue]
@@ -5,17 +5,42 @@
 """
 
 import dataclasses
-from typing import Dict, Iterable, List, Literal, Optional, Tuple, Type, Union, Any
+import functools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import colander
 from restfw.typing import PyramidRequest
 from restfw.views import HalResourceView
 
 from . import models
-from .fields import get_field_widgets, get_input_widgets
+from .fields import (
+    bind_partially,
+    get_field_model,
+    get_schema_widgets,
+    is_static_schema,
+)
 from .models import FieldModel
 from .typing import ColanderNode
-from .widgets import ArrayField, MappingField, NestedArrayField, Widget
+from .widgets import (
+    ArrayField,
+    DynSelectBase,
+    MappingField,
+    NestedArrayField,
+    Widget,
+)
 
 
 @dataclasses.dataclass()
@@ -61,6 +86,9 @@ class CreateViewSettings(ViewSettings):
     redirect: Literal['list', 'edit', 'show', 'create'] = 'edit'
 
 
+CacheVary = Union[Literal['locale', 'principals'], Callable[[PyramidRequest], Hashable]]
+
+
 class ResourceAdmin:
     title: str
     container_view_class: Type[HalResourceView]
@@ -81,17 +109,34 @@ class ResourceAdmin:
     create_view = CreateViewSettings()
     edit_view = ViewSettings()
     extra: dict[str, Any] = {}
+    # What the result of get_resource_info() depends on, besides the
+    # configuration of application. It is used to build a key of cache
+    # of compiled resource info:
+    # - empty tuple - nothing, the info is built once for all requests
+    #   if schemas of views don't have deferred values;
+    # - 'locale' - locale name of request;
+    # - 'principals' - effective principals of request;
+    # - callable - a function that returns a hashable key for given request.
+    # None (default) means that the info is not cached, because
+    # a resource admin may use the request in any way.
+    cache_vary: Optional[Tuple[CacheVary, ...]] = None
 
     def __init__(self, request: PyramidRequest, name: str):
         self._request = request
         self._registry = request.registry
         self._name = name
+        # Classes of schema nodes and names of choice groups
+        # that were used to build views
+        self._dependencies: Set[Hashable] = set()
+        # Schemas instantiated and bound during the build of resource info
+        self._schemas: Dict[type, ColanderNode] = {}
+        self._bound_schemas: Dict[type, ColanderNode] = {}
         if not self.location:
             self.location = f'/{name}'  # TODO: url-encode
 
         if not self.embedded_name:
-            schema: ColanderNode = (
-                self.container_view_class.options_for_get.output_schema()
+            schema = self._get_schema_node(
+                self.container_view_class.options_for_get.output_schema, bind=False
             )
             for node in schema.children:
                 if node.name == '_embedded' and node.children:
@@ -106,6 +151,29 @@ class ResourceAdmin:
             elif self.child_view_class.options_for_put:
                 self.update_method = 'put'
 
+    @classmethod
+    def get_cache_key(cls, request: PyramidRequest) -> Optional[Tuple[Hashable, ...]]:
+        """Returns a key of cache of compiled resource info for given request
+        or None if the info must not be cached."""
+        if cls.cache_vary is None:
+            return None
+        if not cls.cache_vary:
+            # Deferred values of schemas may depend on the request
+            if all(map(is_static_schema, cls.get_schema_classes())):
+                return ()
+            return None
+        key = []
+        for vary in cls.cache_vary:
+            if vary == 'locale':
+                key.append(request.locale_name)
+            elif vary == 'principals':
+                key.append(tuple(sorted(map(str, request.effective_principals))))
+            elif callable(vary):
+                key.append(vary(request))
+            else:
+                raise ValueError(f'Unknown cache vary: {vary!r}')
+        return tuple(key)
+
     def get_resource_info(self) -> models.ResourceInfoModel:
         views = models.ViewsModel(
             list=self.get_list_view(),
@@ -128,15 +196,62 @@ class ResourceAdmin:
             extra=self.extra,
         )
 
+    def get_dependencies(self) -> Set[Hashable]:
+        """Returns view classes, schema classes and names of choice groups
+        the information about resource depends on. Names of choice groups
+        and classes of nested schema nodes are known only after
+        ``get_resource_info()`` call."""
+        dependencies = set(self._dependencies)
+        for view_class in (self.container_view_class, self.child_view_class):
+            if view_class is not None:
+                dependencies.add(view_class)
+        dependencies.update(self.get_schema_classes())
+        return dependencies
+
+    @classmethod
+    def get_schema_classes(cls) -> Set[Type[ColanderNode]]:
+        """Returns classes of input and output schemas of views."""
+        schema_classes = set()
+        for view_class in (cls.container_view_class, cls.child_view_class):
+            if view_class is None:
+                continue
+            for method in ('get', 'post', 'put', 'patch', 'delete'):
+                options = getattr(view_class, f'options_for_{method}', None)
+                if not options:
+                    continue
+                for schema_class in (options.input_schema, options.output_schema):
+                    if schema_class:
+                        schema_classes.add(schema_class)
+        return schema_classes
+
+    def get_resource_index(self) -> models.ResourceIndexModel:
+        """Returns short information about the resource without
+        converting of its schemas into widgets."""
+        has_list_view = False
+        if self.list_view is not None:
+            options_for_get = self.container_view_class.options_for_get
+            has_list_view = bool(options_for_get and options_for_get.output_schema)
+        return models.ResourceIndexModel(
+            index=self.index,
+            name=self._name,
+            title=self.title,
+            location=self.location,
+            id_field=self.id_field,
+            embedded_name=self.embedded_name,
+            update_method=self.update_method.upper(),
+            deletable=self.child_view_class.options_for_delete is not None,
+            order_by=self.order_by or [],
+            extra=self.extra,
+            has_list_view=has_list_view,
+        )
+
     def get_list_view(self) -> Optional[models.ListViewModel]:
         if self.list_view is None:
             return None
         options_for_get = self.container_view_class.options_for_get
         if not options_for_get or not options_for_get.output_schema:
             return None
-        schema: ColanderNode = options_for_get.output_schema().bind(
-            request=self._request, context=None
-        )
+        schema = self._get_schema_node(options_for_get.output_schema)
         embedded_node: Optional[ColanderNode] = schema.get('_embedded')
         if not embedded_node:
             return None
@@ -154,16 +269,21 @@ class ResourceAdmin:
             models.ListViewModel,
             fields_type='view',
             use_nested_array_field=True,
+            schema_class=options_for_get.output_schema,
+            schema_path=('_embedded', self.embedded_name, 0),
         )
         if list_view and self.list_view.filters:
             filters = self.list_view.filters
-            input_schema: ColanderNode = options_for_get.input_schema().bind(
-                request=self._request, context=None
-            )
+            input_schema = self._get_schema_node(options_for_get.input_schema)
             if input_schema:
-                filters_widgets = get_input_widgets(self._registry, input_schema)
-                for widget in filters_widgets.values():
-                    widget.helper_text = None
+                filters_widgets = get_schema_widgets(
+                    self._registry,
+                    input_schema,
+                    'input',
+                    schema_class=options_for_get.input_schema,
+                )
+                for name, widget in filters_widgets.items():
+                    filters_widgets[name] = widget.replace(helper_text=None)
                 list_view.filters = self._widgets_to_fields(
                     ViewSettings(
                         fields=filters.fields,
@@ -181,35 +301,45 @@ class ResourceAdmin:
                     fields=[],
                 )
                 if filters.always_on:
-                    for field in list_view.filters:
-                        if field.source in filters.always_on:
-                            field.params['alwaysOn'] = True
+                    # Models may be shared, so they are replaced, not modified
+                    list_view.filters = [
+                        dataclasses.replace(
+                            field, params={**field.params, 'alwaysOn': True}
+                        )
+                        if field.source in filters.always_on
+                        else field
+                        for field in list_view.filters
+                    ]
         if list_view:
             list_view.infinite_pagination = self.list_view.infinite_pagination
         return list_view
 
     def get_show_view(self) -> Optional[models.ShowViewModel]:
+        schema_class = self._get_schema_class(
+            self.child_view_class,
+            method='get',
+            schema_type='output',
+        )
         return self._get_view(
-            self._get_schema_node(
-                self.child_view_class,
-                method='get',
-                schema_type='output',
-            ),
+            self._get_schema_node(schema_class),
             self.show_view,
             models.ShowViewModel,
             fields_type='view',
+            schema_class=schema_class,
         )
 
     def get_create_view(self) -> Optional[models.CreateViewModel]:
+        schema_class = self._get_schema_class(
+            self.container_view_class,
+            method='post',
+            schema_type='input',
+        )
         view_model = self._get_view(
-            self._get_schema_node(
-                self.container_view_class,
-                method='post',
-                schema_type='input',
-            ),
+            self._get_schema_node(schema_class),
             self.create_view,
             models.CreateViewModel,
             fields_type='input',
+            schema_class=schema_class,
         )
         if view_model and isinstance(self.create_view, CreateViewSettings):
             view_model.redirect = self.create_view.redirect
@@ -217,15 +347,17 @@ class ResourceAdmin:
 
     def get_edit_view(self) -> Optional[models.EditViewModel]:
         if self.update_method:
+            schema_class = self._get_schema_class(
+                self.child_view_class,
+                method=self.update_method,
+                schema_type='input',
+            )
             return self._get_view(
-                self._get_schema_node(
-                    self.child_view_class,
-                    method=self.update_method,
-                    schema_type='input',
-                ),
+                self._get_schema_node(schema_class),
                 self.edit_view,
                 models.EditViewModel,
                 fields_type='input',
+                schema_class=schema_class,
             )
         return None
 
@@ -237,15 +369,20 @@ class ResourceAdmin:
         *,
         fields_type: Literal['view', 'input'],
         use_nested_array_field=False,
+        schema_class: Optional[Type[ColanderNode]] = None,
+        schema_path: Tuple[Hashable, ...] = (),
     ) -> Optional[models.ViewModelType]:
         if schema_node is None:
             return None
 
-        if fields_type == 'input':
-            get_widgets = get_input_widgets
-        else:
-            get_widgets = get_field_widgets
-        widgets = get_widgets(self._registry, schema_node)
+        self._dependencies.update(_get_node_classes(schema_node))
+        widgets = get_schema_widgets(
+            self._registry,
+            schema_node,
+            fields_type,
+            schema_class=schema_class,
+            path=schema_path,
+        )
         fields = self._widgets_to_fields(
             view_settings,
             widgets,
@@ -253,22 +390,40 @@ class ResourceAdmin:
         )
         return view_model_class(fields=fields)
 
-    def _get_schema_node(
-        self,
+    @staticmethod
+    def _get_schema_class(
         view_class: Type[HalResourceView],
         *,
         method: str,
         schema_type: Literal['input', 'output'],
-    ) -> Optional[ColanderNode]:
+    ) -> Optional[Type[ColanderNode]]:
         method_options = getattr(view_class, f'options_for_{method}')
         if not method_options:
             return None
-        schema_class: Type[ColanderNode] = getattr(
-            method_options, f'{schema_type}_schema'
-        )
-        if schema_class:
-            return schema_class().bind(request=self._request, context=None)
-        return None
+        return getattr(method_options, f'{schema_type}_schema')
+
+    def _get_schema_node(
+        self, schema_class: Optional[Type[ColanderNode]], bind=True
+    ) -> Optional[ColanderNode]:
+        """Returns an instance of the schema class bound to the request.
+
+        Every schema is instantiated and bound at most once per instance
+        of ResourceAdmin. Schemas are bound partially - deferred values
+        are resolved only in nodes having them (see ``bind_partially()``).
+        """
+        if not schema_class:
+            return None
+        schema = self._schemas.get(schema_class)
+        if schema is None:
+            schema = self._schemas[schema_class] = schema_class()
+        if not bind:
+            return schema
+        bound_schema = self._bound_schemas.get(schema_class)
+        if bound_schema is None:
+            bound_schema = self._bound_schemas[schema_class] = bind_partially(
+                schema, request=self._request, context=None
+            )
+        return bound_schema
 
     def _widgets_to_fields(
         self,
@@ -282,58 +437,128 @@ class ResourceAdmin:
             default_fields if default_fields is not None else self.default_fields
         )
         fields = fields if fields is not None else self.fields
-        only_field_names: list[str] = []
-        was_only = False
-        for fields in (view_settings.fields, fields, default_fields):
-            if fields:
-                names = unflat(fields.names)
-                if isinstance(fields, Only) and not was_only:
-                    widgets = only_widgets(widgets, names)
-                    only_field_names.extend(fields.names)
-                    was_only = True
-                elif isinstance(fields, Exclude):
-                    widgets = exclude_widgets(widgets, names)
-        if view_settings.widgets:
-            replace_widgets(widgets, view_settings.widgets)
-        if only_field_names:
-            filtered_widgets = {}
-            for name in only_field_names:
-                in_array_field = False
-                widget = None
-                cur_widgets = widgets
-                for sub_name in name.split('.'):
-                    if cur_widgets is None:
-                        break
-                    if isinstance(widget, ArrayField):
-                        in_array_field = True
-                    widget = cur_widgets.get(sub_name, None)
-                    if widget is None:
-                        break
-                    cur_widgets = getattr(widget, 'fields', None)
-                else:
-                    if widget is not None:
-                        if in_array_field and use_nested_array_field:
-                            if isinstance(widget, MappingField):
-                                widget = NestedArrayField(
-                                    label=widget.label,
-                                    fields=widget.fields,
-                                )
-                            elif isinstance(widget, ArrayField):
-                                widget = NestedArrayField(
-                                    label=widget.label,
-                                    fields=widget.fields,
-                                )
-                            elif isinstance(widget, NestedArrayField):
-                                pass
-                            else:
-                                widget = NestedArrayField(
-                                    label=widget.label,
-                                    fields={'': widget},
-                                    single_field=True,
-                                )
-                        filtered_widgets[name] = widget
-            widgets = filtered_widgets
-        return [widget.to_model(name) for name, widget in widgets.items()]
+        plan = get_filter_plan(view_settings.fields, fields, default_fields)
+        widgets = plan.apply(widgets, view_settings.widgets, use_nested_array_field)
+        self._dependencies.update(_get_choice_groups(widgets.values()))
+        return [
+            get_field_model(self._registry, widget, name)
+            for name, widget in widgets.items()
+        ]
+
+
+FieldsSpec = Optional[Union[Only, Exclude]]
+
+
+@dataclasses.dataclass(frozen=True)
+class FilterPlan:
+    """Compiled specifications of fields (Only and Exclude) of a view."""
+
+    # Pairs of "is only" flag and unflatted names of fields
+    steps: Tuple[Tuple[bool, Dict[str, dict]], ...] = ()
+    # Dotted names from Only specification and its parts,
+    # they define a list and order of top-level fields of a view
+    only_names: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+    def apply(
+        self,
+        widgets: Dict[str, Widget],
+        replaces: Optional[WidgetReplaces] = None,
+        use_nested_array_field=False,
+    ) -> Dict[str, Widget]:
+        """Returns filtered widgets. Given widgets are not modified."""
+        for is_only, names in self.steps:
+            if is_only:
+                widgets = only_widgets(widgets, names)
+            else:
+                widgets = exclude_widgets(widgets, names)
+        if replaces:
+            widgets = widgets.copy()
+            replace_widgets(widgets, replaces)
+        if not self.only_names:
+            return widgets
+
+        filtered_widgets = {}
+        for name, parts in self.only_names:
+            in_array_field = False
+            widget = None
+            cur_widgets = widgets
+            for sub_name in parts:
+                if cur_widgets is None:
+                    break
+                if isinstance(widget, ArrayField):
+                    in_array_field = True
+                widget = cur_widgets.get(sub_name, None)
+                if widget is None:
+                    break
+                cur_widgets = getattr(widget, 'fields', None)
+            else:
+                if widget is not None:
+                    if in_array_field and use_nested_array_field:
+                        widget = _to_nested_array_field(widget)
+                    filtered_widgets[name] = widget
+        return filtered_widgets
+
+
+def get_filter_plan(*specs: FieldsSpec) -> FilterPlan:
+    """Returns a compiled plan of filtering of widgets for given
+    specifications of fields. Only the first Only specification is used.
+    Plans are cached by values of specifications."""
+    return _compile_filter_plan(
+        tuple((spec.__class__, spec.names) if spec else None for spec in specs)
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_filter_plan(
+    specs: Tuple[Optional[Tuple[type, Tuple[str, ...]]], ...],
+) -> FilterPlan:
+    steps = []
+    only_names = ()
+    was_only = False
+    for spec in specs:
+        if not spec:
+            continue
+        spec_class, names = spec
+        if issubclass(spec_class, Only) and not was_only:
+            steps.append((True, unflat(names)))
+            only_names = tuple((name, tuple(name.split('.'))) for name in names)
+            was_only = True
+        elif issubclass(spec_class, Exclude):
+            steps.append((False, unflat(names)))
+    return FilterPlan(steps=tuple(steps), only_names=only_names)
+
+
+def _to_nested_array_field(widget: Widget) -> NestedArrayField:
+    if isinstance(widget, (MappingField, ArrayField)):
+        return NestedArrayField(label=widget.label, fields=widget.fields)
+    if isinstance(widget, NestedArrayField):
+        return widget
+    return NestedArrayField(label=widget.label, fields={'': widget}, single_field=True)
+
+
+def _get_node_classes(schema_node: ColanderNode) -> Set[type]:
+    classes = set()
+    nodes = [schema_node]
+    while nodes:
+        node = nodes.pop()
+        classes.add(node.__class__)
+        nodes.extend(node.children)
+    return classes
+
+
+def _get_choice_groups(widgets: Iterable[Widget]) -> Set[str]:
+    """Returns names of choice groups used by DynSelectField and DynSelectInput."""
+    groups = set()
+    widgets = list(widgets)
+    while widgets:
+        widget = widgets.pop()
+        if isinstance(widget, DynSelectBase):
+            groups.add(widget.group)
+        if sub_widgets := getattr(widget, 'fields', None):
+            widgets.extend(sub_widgets.values())
+        if isinstance(child := getattr(widget, 'widget', None), Widget):
+            widgets.append(child)
+    return groups
 
 
 def unflat(names: Iterable[str]) -> Dict[str, dict]:
@@ -361,7 +586,7 @@ def only_widgets(
         if not widget:
             continue
         if inner_names and hasattr(widget, 'fields'):
-            widget.fields = only_widgets(widget.fields, inner_names)
+            widget = widget.replace(fields=only_widgets(widget.fields, inner_names))
         res[name] = widget
     return res
 
@@ -375,14 +600,17 @@ def exclude_widgets(
         if inner_names:
             widget = widgets.get(name)
             if widget and hasattr(widget, 'fields'):
-                widget.fields = exclude_widgets(widget.fields, inner_names)
+                widgets[name] = widget.replace(
+                    fields=exclude_widgets(widget.fields, inner_names)
+                )
         else:
             widgets.pop(name, None)
     return widgets
 
 
 def replace_widgets(widgets: Dict[str, Widget], replaces: WidgetReplaces):
-    """Replace widgets inplace."""
+    """Replace widgets inplace. Nested widgets are not modified,
+    they are replaced by modified copies."""
     for name, value in replaces.items():
         if name not in widgets:
             continue
@@ -393,4 +621,6 @@ def replace_widgets(widgets: Dict[str, Widget], replaces: WidgetReplaces):
         elif isinstance(value, dict):
             current_widget = widgets[name]
             if hasattr(current_widget, 'fields'):
-                replace_widgets(current_widget.fields, value)
+                fields = current_widget.fields.copy()
+                replace_widgets(fields, value)
+                widgets[name] = current_widget.replace(fields=fields)
@@ -4,15 +4,83 @@
 :Date: 05.02.2020
 """
 
-from typing import TypedDict
+import dataclasses
+import hashlib
+from collections.abc import Sequence
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 from pyramid.authorization import Allow, Everyone
+from pyramid.registry import Registry
 from restfw.hal import HalResource, SimpleContainer
 from restfw.root import Root
 from restfw.typing import PyramidRequest
 
+from .cache import (
+    API_INFO_CACHE_KEY,
+    RESOURCE_INFO_CACHE_KEY,
+    LruCache,
+    add_resource_dependencies,
+    build_all,
+    get_admin_config_version,
+    get_cache_size,
+    get_or_build,
+    get_resource_version,
+    is_api_info_cache_enabled,
+)
+from .artifact import get_api_info_artifact
+from .choices import (
+    PageableChoicesProvider,
+    get_group_choice,
+    get_group_choices,
+    get_group_choices_by_ids,
+    get_pageable_provider,
+)
 from .interfaces import IAdminChoices, IResourceAdminFabric
+from .interning import intern_models
+from .models import ResourceIndexModel, ResourceInfoModel
 from .resource_admin import ResourceAdmin
+from .serializer import RawJson, dumps
+
+
+@dataclasses.dataclass()
+class CompiledResourceInfo:
+    """Request independent information about one resource admin."""
+
+    info: ResourceInfoModel
+    # Already serialized into JSON
+    body: str
+    # Hash of content of resource info, it is used to build ETag
+    content_hash: str = ''
+    # View classes, schema classes and names of choice groups
+    # used to build the info
+    dependencies: FrozenSet[Hashable] = frozenset()
+
+
+@dataclasses.dataclass()
+class CompiledApiInfo:
+    """Request independent part of api_info that is built once
+    and shared between requests."""
+
+    # It is empty if resources are loaded from offline compiled artifact
+    resources: Dict[str, Union[ResourceInfoModel, ResourceIndexModel]]
+    # Already serialized into JSON, it is a memoryview of UTF-8 encoded JSON
+    # if resources are loaded from offline compiled artifact
+    resources_body: Union[str, memoryview]
+    # Hash of content of resources, it is used to build ETag of api_info
+    content_hash: str = ''
+    # Serialized subtrees referenced from resources_body by "$ref",
+    # if api_info was compiled with shared fields.
+    shared_body: Optional[Union[str, memoryview]] = None
 
 
 class ApiInfo(HalResource):
@@ -22,13 +90,255 @@ class ApiInfo(HalResource):
 
     def get_resources_info(self, request: PyramidRequest):
         registry = request.registry
+
+        def build(item) -> ResourceInfoModel:
+            name, fabric = item
+            resource_admin: ResourceAdmin = fabric(request, name)
+            return resource_admin.get_resource_info()
+
+        resources = build_all(
+            request, build, sorted(registry.getUtilitiesFor(IResourceAdminFabric))
+        )
+        return {info.name: info for info in sorted(resources, key=lambda x: x.title)}
+
+    def get_resources_index(self, request: PyramidRequest):
+        """Returns short information about resources without views.
+        It doesn't require converting of resource schemas into widgets."""
+        registry = request.registry
+        admin_resources = get_admin_resources(request.root)
         resources = []
         for name, fabric in registry.getUtilitiesFor(IResourceAdminFabric):
             resource_admin: ResourceAdmin = fabric(request, name)
-            info = resource_admin.get_resource_info()
+            info = resource_admin.get_resource_index()
+            info.info_location = request.resource_url(
+                ResourceInfo(name, parent=admin_resources), app_url=''
+            ).rstrip('/')
             resources.append(info)
         return {info.name: info for info in sorted(resources, key=lambda x: x.title)}
 
+    def get_compiled_info(
+        self, request: PyramidRequest, index_only=False, shared_fields=False
+    ) -> CompiledApiInfo:
+        """Returns compiled resources of api_info.
+
+        If ``shared_fields`` is True, identical subtrees of fields and lists
+        of choices are placed once into ``shared_body`` and replaced
+        by references in ``resources_body``. It is ignored for index,
+        because index doesn't contain fields.
+        """
+        registry = request.registry
+        shared_fields = shared_fields and not index_only
+        if not is_api_info_cache_enabled(registry):
+            return self._compile(request, index_only, shared_fields)
+        fabrics = sorted(registry.getUtilitiesFor(IResourceAdminFabric))
+        resource_keys = tuple(
+            (
+                name,
+                get_resource_version(registry, name),
+                get_resource_cache_key(fabric, request),
+            )
+            for name, fabric in fabrics
+        )
+        if any(key is None for _, _, key in resource_keys):
+            # Some resources must not be cached, but others still
+            # can be taken from the cache of compiled resources.
+            return self._compile_from_resources(request, index_only, shared_fields)
+        if not index_only and all(key == () for _, _, key in resource_keys):
+            # Artifact contains only request independent information
+            artifact = get_api_info_artifact(registry)
+            if artifact is not None:
+                if shared_fields:
+                    return CompiledApiInfo(
+                        resources={},
+                        resources_body=artifact.shared_resources_body,
+                        content_hash=artifact.shared_content_hash,
+                        shared_body=artifact.shared_body,
+                    )
+                return CompiledApiInfo(
+                    resources={},
+                    resources_body=artifact.resources_body,
+                    content_hash=artifact.content_hash,
+                )
+        cache: LruCache[CompiledApiInfo] = get_or_build(
+            registry,
+            API_INFO_CACHE_KEY,
+            lambda: LruCache(
+                get_cache_size(registry, 'restfw_admin.api_info_cache_size', 32)
+            ),
+        )
+        return cache.get_or_build(
+            (
+                get_admin_config_version(registry),
+                index_only,
+                shared_fields,
+                resource_keys,
+            ),
+            lambda: self._compile_from_resources(request, index_only, shared_fields),
+        )
+
+    def _compile(
+        self, request: PyramidRequest, index_only: bool, shared_fields=False
+    ) -> CompiledApiInfo:
+        if index_only:
+            resources = self.get_resources_index(request)
+        else:
+            resources = self.get_resources_info(request)
+        if shared_fields:
+            return _compile_with_shared_fields(resources)
+        resources_body = dumps(resources)
+        return CompiledApiInfo(
+            resources=resources,
+            resources_body=resources_body,
+            content_hash=get_content_hash(resources_body),
+        )
+
+    def _compile_from_resources(
+        self, request: PyramidRequest, index_only: bool, shared_fields=False
+    ) -> CompiledApiInfo:
+        if index_only:
+            # Index is cheap, it is built without the cache of resources
+            return self._compile(request, index_only)
+        admin_resources = get_admin_resources(request.root)
+        names = sorted(
+            name for name, _ in request.registry.getUtilitiesFor(IResourceAdminFabric)
+        )
+        resources = [ResourceInfo(name, admin_resources) for name in names]
+        compiled_resources = [r.get_cached_info(request) for r in resources]
+        missing = [r for r, c in zip(resources, compiled_resources) if c is None]
+        if missing:
+            # Only resources absent in the cache are built
+            built = iter(
+                build_all(request, lambda r: r.get_compiled_info(request), missing)
+            )
+            compiled_resources = [c or next(built) for c in compiled_resources]
+        compiled_resources.sort(key=lambda x: x.info.title)
+        if shared_fields:
+            return _compile_with_shared_fields(
+                {c.info.name: c.info for c in compiled_resources}
+            )
+        return CompiledApiInfo(
+            resources={c.info.name: c.info for c in compiled_resources},
+            resources_body=dumps(
+                {c.info.name: RawJson(c.body) for c in compiled_resources}
+            ),
+            content_hash=get_content_hash(
+                ''.join(c.content_hash for c in compiled_resources)
+            ),
+        )
+
+
+def _compile_with_shared_fields(
+    resources: Dict[str, ResourceInfoModel],
+) -> CompiledApiInfo:
+    resources_body, shared_body = intern_models(resources)
+    return CompiledApiInfo(
+        resources=resources,
+        resources_body=resources_body,
+        content_hash=get_content_hash(f'{resources_body}\n{shared_body}'),
+        shared_body=shared_body,
+    )
+
+
+class ResourceInfo(HalResource):
+    """Full information about one resource admin, including its views."""
+
+    url_placeholder = '<resource_name>.json'
+
+    def __init__(self, name: str, parent: HalResource):
+        self.__parent__ = parent
+        self.__name__ = f'{name}.json'
+        self.name = name
+
+    def get_compiled_info(self, request: PyramidRequest) -> CompiledResourceInfo:
+        """Returns compiled info from the cache. The cache is keyed by
+        ``ResourceAdmin.get_cache_key()``, so different info can be built
+        for different requests.
+        """
+        fabric, cache, key = self._get_cache(request)
+        if cache is None:
+            return self._compile(request, fabric)
+        return cache.get_or_build(key, lambda: self._compile(request, fabric))
+
+    def get_cached_info(
+        self, request: PyramidRequest
+    ) -> Optional[CompiledResourceInfo]:
+        """Returns compiled info if it is present in the cache."""
+        _, cache, key = self._get_cache(request)
+        return None if cache is None else cache.get(key)
+
+    def _get_cache(
+        self, request: PyramidRequest
+    ) -> Tuple[Any, Optional[LruCache[CompiledResourceInfo]], Hashable]:
+        """Returns the fabric of resource admin, the cache of compiled info
+        and a key in this cache. The cache is None if the info must not
+        be cached for the request."""
+        registry = request.registry
+        fabric = registry.getUtility(IResourceAdminFabric, name=self.name)
+        if not is_api_info_cache_enabled(registry):
+            return fabric, None, None
+        key = get_resource_cache_key(fabric, request)
+        if key is None:
+            return fabric, None, None
+        caches: Dict[str, LruCache[CompiledResourceInfo]] = get_or_build(
+            registry, RESOURCE_INFO_CACHE_KEY, dict
+        )
+        cache = caches.get(self.name)
+        if cache is None:
+            cache = caches.setdefault(
+                self.name,
+                LruCache(
+                    get_cache_size(
+                        registry, 'restfw_admin.resource_info_cache_size', 128
+                    )
+                ),
+            )
+        return fabric, cache, (get_resource_version(registry, self.name), key)
+
+    def _compile(self, request: PyramidRequest, fabric) -> CompiledResourceInfo:
+        resource_admin: ResourceAdmin = fabric(request, self.name)
+        info = resource_admin.get_resource_info()
+        body = dumps(info)
+        dependencies = frozenset(resource_admin.get_dependencies())
+        add_resource_dependencies(request.registry, self.name, dependencies)
+        return CompiledResourceInfo(
+            info=info,
+            body=body,
+            content_hash=get_content_hash(body),
+            dependencies=dependencies,
+        )
+
+
+def get_resource_cache_key(fabric, request: PyramidRequest) -> Optional[Hashable]:
+    """Returns a key of cache of compiled info of resource created by
+    the given fabric, or None if the info must not be cached."""
+    get_cache_key = getattr(fabric, 'get_cache_key', None)
+    if get_cache_key is None:
+        return ()
+    return get_cache_key(request)
+
+
+class ResourcesInfo(HalResource):
+    __acl__ = [
+        (Allow, Everyone, 'rest_admin.api_info.'),
+    ]
+
+    def __getitem__(self, key: str):
+        if key.endswith('.json'):
+            name = key[: -len('.json')]
+            registry = self.get_registry()
+            if registry.queryUtility(IResourceAdminFabric, name=name):
+                return ResourceInfo(name, parent=self)
+        return super().__getitem__(key)
+
+
+def get_content_hash(body: str) -> str:
+    """Returns a hash of serialized document.
+
+    >>> get_content_hash('{"a":null,"b":[1,2]}')
+    '3f2a35ff1a3876f3bd2c97710bc3752a'
+    """
+    return hashlib.md5(body.encode('utf-8')).hexdigest()
+
 
 class ChoiceModel(TypedDict):
     uniq_id: str
@@ -48,14 +358,24 @@ class AdminChoice(HalResource):
 
 class AdminChoices(HalResource):
     def __getitem__(self, key):
-        group = key.split(':', 1)
-        if group:
-            choices = self.get_choices(self.get_registry(), group)
-            for choice in choices:
-                if choice.model['uniq_id'] == key:
-                    return choice
+        group, sep, choice_id = key.partition(':')
+        if group and sep:
+            item = get_group_choice(self.get_registry(), group, choice_id)
+            if item is not None:
+                return self._make_choice(group, *item)
         return super().__getitem__(key)
 
+    def _make_choice(self, group: str, value, title: str) -> AdminChoice:
+        return AdminChoice(
+            model={
+                'uniq_id': f'{group}:{value}',
+                'group': group,
+                'id': value,
+                'name': title,
+            },
+            parent=self,
+        )
+
     def get_choices(self, registry, group=None, choice_ids=None):
         if group:
             utility = registry.queryUtility(IAdminChoices, name=group)
@@ -66,21 +386,75 @@ class AdminChoices(HalResource):
         else:
             utilities = list(registry.getUtilitiesFor(IAdminChoices))
 
-        choice_ids = set(choice_ids) if choice_ids else None
+        choice_ids = list(dict.fromkeys(choice_ids)) if choice_ids else None
         utilities.sort(key=lambda x: x[0])
-        for group, utility in utilities:
-            for value, title in utility(registry):
-                if choice_ids and value not in choice_ids:
-                    continue
-                yield AdminChoice(
-                    model={
-                        'uniq_id': f'{group}:{value}',
-                        'group': group,
-                        'id': value,
-                        'name': title,
-                    },
-                    parent=self,
-                )
+        for group, _ in utilities:
+            if choice_ids:
+                items = get_group_choices_by_ids(registry, group, choice_ids)
+            else:
+                items = get_group_choices(registry, group)
+            for value, title in items:
+                yield self._make_choice(group, value, title)
+
+    def get_choices_sequence(
+        self, registry, group=None, choice_ids=None
+    ) -> Sequence[AdminChoice]:
+        """Returns a sequence of choices. Choices of the group which
+        provider has ``page()`` and ``count()`` methods are requested
+        from the provider by slices during access to the sequence."""
+        if group and not choice_ids:
+            provider = get_pageable_provider(registry, group)
+            if provider is not None:
+                return PagedAdminChoices(self, registry, group, provider)
+        return list(self.get_choices(registry, group, choice_ids))
+
+
+class PagedAdminChoices(Sequence[AdminChoice]):
+    """Lazy sequence of choices of one group. Slices of it are
+    requested from the provider of choices, and total number of choices
+    is requested only if it is needed."""
+
+    def __init__(
+        self,
+        parent: AdminChoices,
+        registry: Registry,
+        group: str,
+        provider: PageableChoicesProvider,
+    ):
+        self._parent = parent
+        self._registry = registry
+        self._group = group
+        self._provider = provider
+        self._count: Optional[int] = None
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self._provider.count(self._registry)
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = index.start or 0, index.stop
+            if stop is None or start < 0 or stop < 0 or index.step not in (None, 1):
+                start, stop, step = index.indices(len(self))
+                if step < 0:
+                    return self[0 : len(self)][index]
+                if step > 1:
+                    return self[start:stop][::step]
+            return self._get_page(start, stop - start) if stop > start else []
+        if index < 0:
+            index += len(self)
+        choices = self._get_page(index, 1) if index >= 0 else []
+        if not choices:
+            raise IndexError('choice index out of range')
+        return choices[0]
+
+    def _get_page(self, offset: int, limit: int) -> List[AdminChoice]:
+        items = self._provider.page(self._registry, offset, limit)
+        return [
+            self._parent._make_choice(self._group, value, title)
+            for value, title in items
+        ]
 
 
 class Admin(SimpleContainer):
@@ -92,6 +466,7 @@ class Admin(SimpleContainer):
         super().__init__()
         self['choices'] = AdminChoices()
         self['api_info.json'] = ApiInfo()
+        self['resources'] = ResourcesInfo()
 
 
 def get_admin(root: Root) -> Admin:
@@ -103,3 +478,8 @@ def get_admin(root: Root) -> Admin:
 def get_admin_choices(root: Root) -> AdminChoices:
     admin = get_admin(root)
     return admin['choices']
+
+
+def get_admin_resources(root: Root) -> ResourcesInfo:
+    admin = get_admin(root)
+    return admin['resources']
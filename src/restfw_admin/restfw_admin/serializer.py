@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Fast JSON serializer for dataclasses from ``models`` module.
+
+Unlike ``dataclasses.asdict()`` + ``json.dumps()`` it doesn't create
+intermediate dictionaries. It walks a tree of models once and writes
+JSON directly. A writer for every dataclass is compiled once per class.
+
+A dataclass may have a field with ``metadata={RAW_JSON_FIELD: True}``.
+This field is not serialized, but if it is not None, it is written instead
+of the whole dataclass (see ``prerender()``).
+"""
+
+import dataclasses
+import functools
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+
+__all__ = [
+    'RAW_JSON_FIELD',
+    'RawJson',
+    'dumps',
+    'get_serialized_fields',
+    'prerender',
+]
+
+
+RAW_JSON_FIELD = 'restfw_admin.raw_json'
+
+
+_encode_str = json.encoder.encode_basestring_ascii
+
+# Writer takes a value, the output list and the depth of the value.
+# Containers nested deeper than _MAX_RECURSION_DEPTH are not written
+# by the writer, it returns an iterator over nested containers instead,
+# so the depth of values is not limited by the recursion limit.
+_Writer = Callable[[Any, List[str], int], Optional[Iterator]]
+
+_MAX_RECURSION_DEPTH = 64
+
+
+class RawJson:
+    """Already serialized JSON value, it is written as is."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self):
+        return f'RawJson({self.text!r})'
+
+
+def dumps(value: Any) -> str:
+    """Serializes a model (or any JSON-compatible value) into JSON.
+
+    >>> from restfw_admin.models import FieldModel, ValidatorModel
+    >>> dumps(FieldModel('TextInput', 'name', {'label': 'Name'}, [ValidatorModel('required')]))
+    '{"type":"TextInput","source":"name","params":{"label":"Name"},"validators":[{"name":"required","args":[]}],"id":"name"}'
+    >>> dumps({'body': RawJson('[1,2]'), 'pi': 3.5, 'ok': True, 'none': None})
+    '{"body":[1,2],"pi":3.5,"ok":true,"none":null}'
+    """
+    out: List[str] = []
+    _write(value, out)
+    return ''.join(out)
+
+
+T = TypeVar('T')
+
+
+def prerender(value: T) -> T:
+    """Stores serialized JSON of the dataclass into its raw JSON field,
+    so the serializer copies it instead of walking the value again.
+    The value must not be modified after that.
+
+    >>> from restfw_admin.models import FieldModel
+    >>> model = prerender(FieldModel('TextField', 'name', {'label': 'Name'}))
+    >>> model.fragment
+    '{"type":"TextField","source":"name","params":{"label":"Name"},"validators":[],"id":"name"}'
+    >>> dumps([model]) == f'[{model.fragment}]'
+    True
+    """
+    name = _get_raw_json_field(value.__class__)
+    if name is None:
+        raise TypeError(f'{value.__class__.__name__} does not have raw JSON field')
+    setattr(value, name, None)
+    setattr(value, name, dumps(value))
+    return value
+
+
+@functools.cache
+def get_serialized_fields(cls: type) -> Tuple[str, ...]:
+    """Returns names of serialized fields of the dataclass."""
+    return tuple(
+        f.name for f in dataclasses.fields(cls) if not f.metadata.get(RAW_JSON_FIELD)
+    )
+
+
+@functools.cache
+def _get_raw_json_field(cls: type) -> Optional[str]:
+    for f in dataclasses.fields(cls):
+        if f.metadata.get(RAW_JSON_FIELD):
+            return f.name
+    return None
+
+
+def _write(value: Any, out: List[str]):
+    writer = _writers.get(value.__class__)
+    if writer is None:
+        writer = _get_writer(value.__class__)
+    nested = writer(value, out, 0)
+    if nested is not None:
+        _write_nested(nested)
+
+
+def _write_nested(nested: Iterator):
+    """Writes deeply nested containers without recursion."""
+    stack = [nested]
+    while stack:
+        for nested in stack[-1]:
+            stack.append(nested)
+            break
+        else:
+            stack.pop()
+
+
+def _write_str(value: str, out: List[str], depth: int):
+    out.append(_encode_str(value))
+
+
+def _write_int(value: int, out: List[str], depth: int):
+    out.append(int.__repr__(value))
+
+
+def _write_float(value: float, out: List[str], depth: int):
+    out.append(_float_to_str(value))
+
+
+def _write_bool(value: bool, out: List[str], depth: int):
+    out.append('true' if value else 'false')
+
+
+def _write_none(value: None, out: List[str], depth: int):
+    out.append('null')
+
+
+def _write_raw(value: RawJson, out: List[str], depth: int):
+    out.append(value.text)
+
+
+def _write_list(value: list, out: List[str], depth: int) -> Optional[Iterator]:
+    if not value:
+        out.append('[]')
+        return None
+    if depth >= _MAX_RECURSION_DEPTH:
+        return _iter_list(value, out)
+    depth += 1
+    out.append('[')
+    first = True
+    for item in value:
+        if first:
+            first = False
+        else:
+            out.append(',')
+        writer = _writers.get(item.__class__)
+        if writer is None:
+            writer = _get_writer(item.__class__)
+        nested = writer(item, out, depth)
+        if nested is not None:
+            _write_nested(nested)
+    out.append(']')
+    return None
+
+
+def _iter_list(value: list, out: List[str]) -> Iterator:
+    out.append('[')
+    first = True
+    for item in value:
+        if first:
+            first = False
+        else:
+            out.append(',')
+        writer = _writers.get(item.__class__)
+        if writer is None:
+            writer = _get_writer(item.__class__)
+        nested = writer(item, out, _MAX_RECURSION_DEPTH)
+        if nested is not None:
+            yield nested
+    out.append(']')
+
+
+def _write_dict(value: dict, out: List[str], depth: int) -> Optional[Iterator]:
+    if not value:
+        out.append('{}')
+        return None
+    if depth >= _MAX_RECURSION_DEPTH:
+        return _iter_dict(value, out)
+    depth += 1
+    sep = '{'
+    for key, item in value.items():
+        if key.__class__ is not str:
+            key = _key_to_str(key)
+        out.append(sep)
+        out.append(_encode_str(key))
+        out.append(':')
+        writer = _writers.get(item.__class__)
+        if writer is None:
+            writer = _get_writer(item.__class__)
+        nested = writer(item, out, depth)
+        if nested is not None:
+            _write_nested(nested)
+        sep = ','
+    out.append('}')
+    return None
+
+
+def _iter_dict(value: dict, out: List[str]) -> Iterator:
+    sep = '{'
+    for key, item in value.items():
+        if key.__class__ is not str:
+            key = _key_to_str(key)
+        out.append(sep)
+        out.append(_encode_str(key))
+        out.append(':')
+        writer = _writers.get(item.__class__)
+        if writer is None:
+            writer = _get_writer(item.__class__)
+        nested = writer(item, out, _MAX_RECURSION_DEPTH)
+        if nested is not None:
+            yield nested
+        sep = ','
+    out.append('}')
+
+
+_writers: Dict[type, _Writer] = {
+    str: _write_str,
+    int: _write_int,
+    float: _write_float,
+    bool: _write_bool,
+    type(None): _write_none,
+    list: _write_list,
+    tuple: _write_list,
+    dict: _write_dict,
+    RawJson: _write_raw,
+}
+
+
+def _get_writer(cls: type) -> _Writer:
+    writer: Optional[_Writer] = None
+    if dataclasses.is_dataclass(cls):
+        writer = _compile_dataclass_writer(cls)
+    else:
+        # Subclasses of builtin types (enums, etc.)
+        for base, base_writer in _base_writers:
+            if issubclass(cls, base):
+                writer = base_writer
+                break
+    if writer is None:
+        raise TypeError(f'Object of type {cls.__name__} is not JSON serializable')
+    _writers[cls] = writer
+    return writer
+
+
+def _write_str_subclass(value: str, out: List[str], depth: int):
+    out.append(_encode_str(str.__str__(value)))
+
+
+def _write_int_subclass(value: int, out: List[str], depth: int):
+    out.append(int.__repr__(value))
+
+
+def _write_float_subclass(value: float, out: List[str], depth: int):
+    out.append(_float_to_str(float(value)))
+
+
+_base_writers = (
+    (bool, _write_bool),
+    (str, _write_str_subclass),
+    (int, _write_int_subclass),
+    (float, _write_float_subclass),
+    (dict, _write_dict),
+    ((list, tuple), _write_list),
+)
+
+
+def _compile_dataclass_writer(cls: type) -> _Writer:
+    write_fields = _compile_fields_writer(cls)
+    raw_json_field = _get_raw_json_field(cls)
+    if raw_json_field is None:
+        return write_fields
+
+    def write_prerendered(value, out: List[str], depth: int) -> Optional[Iterator]:
+        text = getattr(value, raw_json_field)
+        if text is None:
+            return write_fields(value, out, depth)
+        out.append(text)
+        return None
+
+    return write_prerendered
+
+
+def _compile_fields_writer(cls: type) -> _Writer:
+    names = get_serialized_fields(cls)
+    if not names:
+
+        def write_empty(value, out: List[str], depth: int):
+            out.append('{}')
+
+        return write_empty
+
+    # Prefixes of fields are rendered once, e.g. '{"type":' or ',"source":'
+    items = tuple(
+        (('{' if i == 0 else ',') + _encode_str(name) + ':', name)
+        for i, name in enumerate(names)
+    )
+
+    def write_dataclass(value, out: List[str], depth: int) -> Optional[Iterator]:
+        if depth >= _MAX_RECURSION_DEPTH:
+            return iter_dataclass(value, out)
+        depth += 1
+        for prefix, name in items:
+            out.append(prefix)
+            item = getattr(value, name)
+            writer = _writers.get(item.__class__)
+            if writer is None:
+                writer = _get_writer(item.__class__)
+            nested = writer(item, out, depth)
+            if nested is not None:
+                _write_nested(nested)
+        out.append('}')
+        return None
+
+    def iter_dataclass(value, out: List[str]) -> Iterator:
+        for prefix, name in items:
+            out.append(prefix)
+            item = getattr(value, name)
+            writer = _writers.get(item.__class__)
+            if writer is None:
+                writer = _get_writer(item.__class__)
+            nested = writer(item, out, _MAX_RECURSION_DEPTH)
+            if nested is not None:
+                yield nested
+        out.append('}')
+
+    return write_dataclass
+
+
+def _float_to_str(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _key_to_str(key: Any) -> str:
+    # The same rules as in json.dumps()
+    if isinstance(key, str):
+        return str.__str__(key)
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return _float_to_str(key)
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(
+        f'keys must be str, int, float, bool or None, not {key.__class__.__name__}'
+    )
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Benchmarks of building and serialization of admin metadata.
+Run it as a script:
+
+    python -m restfw_admin.tests.benchmarks
+"""
+
+import dataclasses
+import json
+import sys
+import timeit
+
+import colander
+from pyramid.config import Configurator
+from pyramid.registry import Registry
+
+from ..cache import invalidate_admin_caches
+from ..fields import get_field_widgets, get_input_widgets
+from ..models import (
+    ApiInfoModel,
+    CreateViewModel,
+    EditViewModel,
+    FieldModel,
+    ListViewModel,
+    ResourceInfoModel,
+    ShowViewModel,
+    ValidatorModel,
+    ViewsModel,
+)
+from ..serializer import dumps
+
+
+def make_fields(count: int, depth: int = 2) -> list[FieldModel]:
+    fields = []
+    for i in range(count):
+        if depth and i % 10 == 0:
+            fields.append(
+                FieldModel(
+                    type='MappingInput',
+                    source=f'mapping_{i}',
+                    params={
+                        'label': f'Mapping {i}',
+                        'fields': make_fields(count // 4, depth - 1),
+                    },
+                )
+            )
+        else:
+            fields.append(
+                FieldModel(
+                    type='TextInput',
+                    source=f'field_{i}',
+                    params={'label': f'Field {i}', 'fullWidth': True},
+                    validators=[
+                        ValidatorModel('required'),
+                        ValidatorModel('maxLength', (255,)),
+                    ],
+                )
+            )
+    return fields
+
+
+def make_api_info_model(resources: int = 150, fields: int = 20) -> ApiInfoModel:
+    infos = {}
+    for i in range(resources):
+        name = f'resource_{i}'
+        infos[name] = ResourceInfoModel(
+            index=i,
+            name=name,
+            title=f'Resource {i}',
+            location=f'/{name}',
+            id_field='id',
+            embedded_name=name,
+            update_method='PATCH',
+            deletable=True,
+            order_by=['id'],
+            views=ViewsModel(
+                list=ListViewModel(
+                    fields=make_fields(fields), filters=make_fields(fields // 4)
+                ),
+                show=ShowViewModel(fields=make_fields(fields)),
+                create=CreateViewModel(fields=make_fields(fields)),
+                edit=EditViewModel(fields=make_fields(fields)),
+            ),
+            extra={},
+        )
+    return ApiInfoModel(
+        root_url='http://localhost',
+        title='Admin UI',
+        resources=infos,
+        extra={},
+    )
+
+
+def make_deep_schema(depth: int) -> colander.SchemaNode:
+    """Returns a schema with ``depth`` levels of nested mappings and sequences."""
+    node = colander.SchemaNode(colander.String(), name='value')
+    for i in range(depth):
+        children = [
+            node,
+            colander.SchemaNode(
+                colander.Integer(), name='count', validator=colander.Range(0, 100)
+            ),
+        ]
+        if i % 2:
+            node = colander.SchemaNode(
+                colander.Sequence(),
+                colander.SchemaNode(colander.Mapping(), *children, name='item'),
+                name=f'sequence_{i}',
+            )
+        else:
+            node = colander.SchemaNode(
+                colander.Mapping(), *children, name=f'mapping_{i}'
+            )
+    return colander.SchemaNode(colander.Mapping(), node)
+
+
+def make_wide_schema(width: int) -> colander.SchemaNode:
+    """Returns a schema with ``width`` nested mappings of ``width`` fields."""
+    return colander.SchemaNode(
+        colander.Mapping(),
+        *(
+            colander.SchemaNode(
+                colander.Mapping(),
+                *(
+                    colander.SchemaNode(
+                        colander.String(),
+                        name=f'field_{j}',
+                        validator=colander.Length(max=255),
+                    )
+                    for j in range(width)
+                ),
+                name=f'mapping_{i}',
+            )
+            for i in range(width)
+        ),
+    )
+
+
+def make_registry() -> Registry:
+    config = Configurator(settings={})
+    config.include('restfw_admin')
+    config.commit()
+    return config.registry
+
+
+def bench(title: str, func, number: int = 5) -> float:
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f'{title:<50} {seconds * 1000:9.2f} ms')
+    return seconds
+
+
+def bench_serializer():
+    """Compares ``dataclasses.asdict() + json.dumps()`` with ``serializer.dumps()``."""
+    model = make_api_info_model()
+    print(f'api_info size: {len(dumps(model)) / 1024:.0f} KiB')
+    slow = bench(
+        'dataclasses.asdict() + json.dumps()',
+        lambda: json.dumps(dataclasses.asdict(model)),
+    )
+    fast = bench('serializer.dumps()', lambda: dumps(model))
+    print(f'Speedup: {slow / fast:.1f}x')
+
+
+def bench_converters():
+    """Converting of deep and wide schemas into widgets."""
+    registry = make_registry()
+
+    def convert(schema):
+        # Widgets of static nodes are cached, so caches are dropped
+        # to measure the conversion itself.
+        invalidate_admin_caches(registry)
+        get_field_widgets(registry, schema)
+        get_input_widgets(registry, schema)
+
+    depth = sys.getrecursionlimit()
+    deep_schema = make_deep_schema(depth)
+    bench(f'Convert schema with depth {depth}', lambda: convert(deep_schema))
+    wide_schema = make_wide_schema(100)
+    bench('Convert schema with 100x100 fields', lambda: convert(wide_schema))
+
+
+def main():
+    bench_serializer()
+    bench_converters()
+
+
+if __name__ == '__main__':
+    main()
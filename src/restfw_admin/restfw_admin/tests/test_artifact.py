@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import io
+import json
+
+from .. import artifact
+from ..admin import AdminChoicesAdmin
+from ..artifact import (
+    get_api_info_artifact,
+    get_registry_fingerprint,
+    write_api_info_artifact,
+)
+from ..cache import (
+    ARTIFACT_FINGERPRINT_KEY,
+    INDEXED_RESOURCES_KEY,
+    RESOURCE_DEPENDENCIES_KEY,
+    invalidate_admin_caches,
+)
+from ..resources import get_admin
+from ..schemas import AdminChoiceSchema
+
+
+def test_api_info_artifact(web_app, pyramid_request, app_config, monkeypatch, tmp_path):
+    app_config.add_resource_admin(AdminChoicesAdmin, name='other_choices')
+    app_config.commit()
+    registry = pyramid_request.registry
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    expected = api_info._compile_from_resources(pyramid_request, index_only=False)
+
+    path = tmp_path / 'api_info.bin'
+    write_api_info_artifact(pyramid_request, str(path))
+    assert path.exists()
+    assert get_api_info_artifact(registry) is None
+
+    monkeypatch.setitem(registry.settings, 'restfw_admin.api_info_artifact', str(path))
+    artifact = get_api_info_artifact(registry)
+    assert artifact is not None
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert compiled.resources == {}
+    # Resources are not decoded from the memory-mapped file
+    assert isinstance(compiled.resources_body, memoryview)
+    assert bytes(compiled.resources_body) == expected.resources_body.encode('utf-8')
+    assert compiled.content_hash == expected.content_hash
+
+    url = pyramid_request.resource_url(api_info)
+    res = web_app.get(url)
+    assert res.json['resources'] == json.loads(expected.resources_body)
+
+    # Artifact contains api_info with shared fields too
+    expected = api_info._compile_from_resources(
+        pyramid_request, index_only=False, shared_fields=True
+    )
+    compiled = api_info.get_compiled_info(pyramid_request, shared_fields=True)
+    assert compiled.resources == {}
+    assert bytes(compiled.resources_body) == expected.resources_body.encode('utf-8')
+    assert bytes(compiled.shared_body) == expected.shared_body.encode('utf-8')
+    assert compiled.content_hash == expected.content_hash
+    res = web_app.get(url, params={'mode': 'shared'})
+    assert res.json['resources'] == json.loads(expected.resources_body)
+    assert res.json['shared'] == json.loads(expected.shared_body)
+
+    # Artifact is not used if configuration of admin has been changed
+    invalidate_admin_caches(registry, resource='other_choices')
+    assert get_api_info_artifact(registry) is None
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert set(compiled.resources) == {'admin_choices', 'other_choices'}
+
+
+def test_api_info_artifact_invalidation(pyramid_request, monkeypatch, tmp_path):
+    registry = pyramid_request.registry
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    path = tmp_path / 'api_info.bin'
+    monkeypatch.setitem(registry.settings, 'restfw_admin.api_info_artifact', str(path))
+    assert get_api_info_artifact(registry) is None
+
+    # Missing artifact is loaded after it has been written
+    write_api_info_artifact(pyramid_request, str(path))
+    assert get_api_info_artifact(registry) is not None
+
+    # Dependencies of resources are unknown for a worker process
+    # which serves them from the artifact.
+    registry.pop(RESOURCE_DEPENDENCIES_KEY)
+    registry.pop(INDEXED_RESOURCES_KEY)
+    assert api_info.get_compiled_info(pyramid_request).resources == {}
+    # So all caches are dropped and the artifact is not used anymore
+    invalidate_admin_caches(registry, depends_on=AdminChoiceSchema)
+    assert get_api_info_artifact(registry) is None
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert 'admin_choices' in compiled.resources
+
+
+def test_broken_api_info_artifact(pyramid_request, monkeypatch, tmp_path):
+    registry = pyramid_request.registry
+    path = tmp_path / 'api_info.bin'
+    path.write_bytes(b'{"format": 100500}\n{}')
+    monkeypatch.setitem(registry.settings, 'restfw_admin.api_info_artifact', str(path))
+    assert get_api_info_artifact(registry) is None
+    compiled = get_admin(pyramid_request.root)['api_info.json'].get_compiled_info(
+        pyramid_request
+    )
+    assert 'admin_choices' in compiled.resources
+
+    # Fixed artifact is loaded again
+    write_api_info_artifact(pyramid_request, str(path))
+    assert get_api_info_artifact(registry) is not None
+
+
+def test_registry_fingerprint(pyramid_request, app_config, monkeypatch):
+    registry = pyramid_request.registry
+    calls = []
+    get_config_fingerprint = artifact._get_config_fingerprint
+
+    def _get_config_fingerprint(registry):
+        calls.append(1)
+        return get_config_fingerprint(registry)
+
+    monkeypatch.setattr(artifact, '_get_config_fingerprint', _get_config_fingerprint)
+    fingerprint = get_registry_fingerprint(registry)
+    # Fingerprint is calculated once per version of admin configuration
+    assert get_registry_fingerprint(registry) == fingerprint
+    assert len(calls) == 1
+
+    invalidate_admin_caches(registry, resource='admin_choices')
+    resource_fingerprint = get_registry_fingerprint(registry)
+    assert resource_fingerprint != fingerprint
+    assert len(calls) == 1
+
+    invalidate_admin_caches(registry)
+    config_fingerprint = get_registry_fingerprint(registry)
+    assert config_fingerprint not in (fingerprint, resource_fingerprint)
+    assert len(calls) == 2
+
+    # Fingerprint depends on ID of build of application
+    monkeypatch.setitem(registry.settings, 'restfw_admin.api_info_build_id', 'v2')
+    registry.pop(ARTIFACT_FINGERPRINT_KEY)
+    assert get_registry_fingerprint(registry) != config_fingerprint
+
+
+def test_sources_hash(monkeypatch):
+    sources_hash = artifact._get_sources_hash([AdminChoicesAdmin])
+    assert artifact._get_sources_hash([AdminChoicesAdmin]) == sources_hash
+
+    # Hash depends on source code of modules with schemas
+    real_open = open
+
+    def patched_open(path, mode='r', *args, **kwargs):
+        f = real_open(path, mode, *args, **kwargs)
+        if path.endswith('schemas.py'):
+            return io.BytesIO(f.read() + b'# changed')
+        return f
+
+    monkeypatch.setattr('builtins.open', patched_open)
+    assert artifact._get_sources_hash([AdminChoicesAdmin]) != sources_hash
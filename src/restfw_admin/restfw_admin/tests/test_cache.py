@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import colander
+
+from ..admin import AdminChoicesAdmin
+from ..cache import (
+    get_admin_config_version,
+    get_dependent_resources,
+    get_resource_version,
+    invalidate_admin_caches,
+)
+from ..fields_converters import string_field
+from ..resource_admin import ViewSettings
+from ..resources import get_admin, get_admin_resources
+from ..schemas import AdminChoiceSchema
+from ..views import AdminChoiceView
+from ..widgets import DynSelectField
+
+
+class Slug(colander.String):
+    pass
+
+
+class GroupedChoicesAdmin(AdminChoicesAdmin):
+    show_view = ViewSettings(
+        widgets={
+            'group': DynSelectField(label='Group', group='choice_groups'),
+        },
+    )
+
+
+def test_admin_config_version(pyramid_request, app_config):
+    registry = pyramid_request.registry
+    version = get_admin_config_version(registry)
+
+    app_config.add_resource_admin(AdminChoicesAdmin, name='other_choices')
+    app_config.commit()
+    assert get_admin_config_version(registry) > version
+    version = get_admin_config_version(registry)
+
+    app_config.add_field_converter(Slug, string_field)
+    app_config.commit()
+    assert get_admin_config_version(registry) > version
+    version = get_admin_config_version(registry)
+
+    invalidate_admin_caches(registry)
+    assert get_admin_config_version(registry) == version + 1
+
+
+def test_invalidate_admin_caches(pyramid_request, app_config):
+    app_config.add_resource_admin(AdminChoicesAdmin, name='other_choices')
+    app_config.commit()
+    registry = pyramid_request.registry
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    admin_resources = get_admin_resources(pyramid_request.root)
+
+    compiled = api_info.get_compiled_info(pyramid_request)
+    choices_info = admin_resources['admin_choices.json'].get_compiled_info(
+        pyramid_request
+    )
+    other_info = admin_resources['other_choices.json'].get_compiled_info(
+        pyramid_request
+    )
+    assert compiled.resources['admin_choices'] is choices_info.info
+    assert compiled.resources['other_choices'] is other_info.info
+
+    # Invalidate only one resource
+    resource_version = get_resource_version(registry, 'other_choices')
+    invalidate_admin_caches(registry, resource='other_choices')
+    assert get_resource_version(registry, 'other_choices') != resource_version
+    new_compiled = api_info.get_compiled_info(pyramid_request)
+    assert new_compiled is not compiled
+    assert new_compiled.resources['admin_choices'] is choices_info.info
+    assert new_compiled.resources['other_choices'] is not other_info.info
+
+    # Invalidate all resources
+    invalidate_admin_caches(registry)
+    new_compiled = api_info.get_compiled_info(pyramid_request)
+    assert new_compiled.resources['admin_choices'] is not choices_info.info
+
+
+def test_invalidate_dependent_resources(pyramid_request, app_config):
+    app_config.add_resource_admin(GroupedChoicesAdmin, name='grouped_choices')
+    app_config.commit()
+    registry = pyramid_request.registry
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    admin_resources = get_admin_resources(pyramid_request.root)
+
+    compiled = api_info.get_compiled_info(pyramid_request)
+    choices_info = admin_resources['admin_choices.json'].get_compiled_info(
+        pyramid_request
+    )
+    grouped_info = admin_resources['grouped_choices.json'].get_compiled_info(
+        pyramid_request
+    )
+    assert AdminChoiceView in grouped_info.dependencies
+    assert AdminChoiceSchema in grouped_info.dependencies
+    assert 'choice_groups' in grouped_info.dependencies
+    assert 'choice_groups' not in choices_info.dependencies
+    assert get_dependent_resources(registry, 'choice_groups') == {'grouped_choices'}
+    assert get_dependent_resources(registry, AdminChoiceSchema) == {
+        'admin_choices',
+        'grouped_choices',
+    }
+
+    # Only resources depending on the choice group are rebuilt
+    invalidate_admin_caches(registry, depends_on='choice_groups')
+    new_compiled = api_info.get_compiled_info(pyramid_request)
+    assert new_compiled is not compiled
+    assert new_compiled.resources['admin_choices'] is choices_info.info
+    assert new_compiled.resources['grouped_choices'] is not grouped_info.info
+    compiled = new_compiled
+
+    # Unknown dependency doesn't drop anything
+    invalidate_admin_caches(registry, depends_on='unknown_group')
+    assert api_info.get_compiled_info(pyramid_request) is compiled
+
+    invalidate_admin_caches(registry, depends_on=AdminChoiceSchema)
+    new_compiled = api_info.get_compiled_info(pyramid_request)
+    assert new_compiled.resources['admin_choices'] is not choices_info.info
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import gc
+import sys
+
+import colander
+
+from .. import widgets
+from ..cache import (
+    FIELD_MODELS_CACHE_KEY,
+    NODE_WIDGETS_CACHE_KEY,
+    WIDGETS_CACHE_KEY,
+    invalidate_admin_caches,
+)
+from ..fields import (
+    bind_partially,
+    get_converter,
+    get_field_model,
+    get_field_widgets,
+    get_input_widgets,
+    get_schema_widgets,
+    is_static_node,
+    is_static_schema,
+)
+from ..fields_converters import string_field
+from ..interfaces import ISchemaNodeToFieldWidget, ISchemaNodeToInputWidget
+from ..serializer import dumps
+from ..validators import Choices, MinLength, Required
+from ..validators_converters import add_validator_converter, get_validators
+from .benchmarks import make_deep_schema, make_wide_schema
+from .utils import CreateUserSchema, Work
+
+
+class Email(colander.String):
+    pass
+
+
+def email_field(registry, node, node_type):
+    return widgets.EmailField(label=node.title)
+
+
+class Colors(colander.OneOf):
+    pass
+
+
+def test_is_static_schema():
+    assert is_static_schema(Work)
+    # "sex" node has deferred validator
+    assert not is_static_schema(CreateUserSchema)
+
+
+def test_schema_widgets_cache(pyramid_request):
+    registry = pyramid_request.registry
+    schema = Work().bind(request=pyramid_request, context=None)
+    widgets = get_schema_widgets(registry, schema, 'input', schema_class=Work)
+    assert widgets == get_input_widgets(registry, schema)
+    assert len(registry[WIDGETS_CACHE_KEY]) == 1
+
+    # Immutable widgets are shared between callers, but dictionaries are not
+    cached_widgets = get_schema_widgets(registry, schema, 'input', schema_class=Work)
+    assert cached_widgets == widgets
+    assert cached_widgets['title'] is widgets['title']
+    del cached_widgets['title']
+    assert get_schema_widgets(registry, schema, 'input', schema_class=Work) == widgets
+
+    get_schema_widgets(registry, schema, 'view', schema_class=Work)
+    assert len(registry[WIDGETS_CACHE_KEY]) == 2
+
+    # Schemas with deferred values are not cached
+    schema = CreateUserSchema().bind(request=pyramid_request, context=None)
+    get_schema_widgets(registry, schema, 'input', schema_class=CreateUserSchema)
+    assert len(registry[WIDGETS_CACHE_KEY]) == 2
+
+    invalidate_admin_caches(registry)
+    assert WIDGETS_CACHE_KEY not in registry
+
+
+def test_bind_partially(pyramid_request):
+    registry = pyramid_request.registry
+    schema = CreateUserSchema()
+    assert is_static_node(schema['current_work'])
+    assert not is_static_node(schema['sex'])
+    # Colander shares class-level sub-nodes between instances of schema
+    assert CreateUserSchema()['current_work'] is schema['current_work']
+
+    bindings = {'request': pyramid_request, 'context': None}
+    bound = bind_partially(schema, **bindings)
+    assert bound is not schema
+    assert bound.bindings == bindings
+    # Static nodes are cloned and bound too, original nodes are not modified
+    assert bound['current_work'] is not schema['current_work']
+    assert bound['current_work'].bindings == bindings
+    assert bound['current_work']['title'].bindings == bindings
+    assert schema['current_work'].bindings is None
+    assert schema['current_work']['title'].bindings is None
+    # Deferred values are resolved
+    assert bound['sex'] is not schema['sex']
+    assert bound['sex'].bindings == bindings
+    assert not isinstance(bound['sex'].validator, colander.deferred)
+    assert isinstance(schema['sex'].validator, colander.deferred)
+    assert [child.name for child in bound] == [child.name for child in schema]
+
+    work = Work()
+    bound_work = bind_partially(work, request=pyramid_request)
+    assert bound_work is not work
+    assert bound_work.bindings == {'request': pyramid_request}
+    assert work.bindings is None
+
+    # Widgets of static nodes are converted once for all bound clones
+    widgets = get_input_widgets(registry, bound)
+    assert widgets == get_input_widgets(registry, schema.bind(**bindings))
+    other_bound = bind_partially(CreateUserSchema(), **bindings)
+    other_widgets = get_input_widgets(registry, other_bound)
+    assert other_widgets['current_work'] is widgets['current_work']
+    assert other_widgets['sex'] is not widgets['sex']
+    invalidate_admin_caches(registry, resource='admin_choices')
+    assert NODE_WIDGETS_CACHE_KEY not in registry
+
+
+def test_converters_get_bindings(pyramid_request, app_config):
+    registry = pyramid_request.registry
+    converted = []
+
+    def text_input(registry, node, node_type):
+        converted.append((node.name, node.bindings))
+        return widgets.TextInput(label=node.title)
+
+    app_config.add_field_converter(colander.String, text_input, is_input=True)
+    app_config.commit()
+    bindings = {'request': pyramid_request, 'context': None}
+    bound = bind_partially(CreateUserSchema(), **bindings)
+    input_widgets = get_input_widgets(registry, bound)
+    assert input_widgets['current_work'].fields['title'].label == 'Title'
+    # Nodes of static sub-tree are bound too
+    assert ('title', bindings) in converted
+    assert ('address', bindings) in converted
+    assert all(node_bindings == bindings for _, node_bindings in converted)
+
+
+def test_field_models_are_prerendered(pyramid_request):
+    registry = pyramid_request.registry
+    widget = get_input_widgets(registry, Work())['title']
+    model = get_field_model(registry, widget, 'title')
+    assert model == widget.to_model('title')
+    assert model.fragment == dumps(widget.to_model('title'))
+    assert dumps([model]) == f'[{model.fragment}]'
+    assert get_field_model(registry, widget, 'title') is model
+    assert get_field_model(registry, widget, 'name') == widget.to_model('name')
+
+    # Models of widgets that are not converted from static nodes are not cached
+    other_widget = widget.replace(label='Other')
+    other_model = get_field_model(registry, other_widget, 'title')
+    assert other_model.fragment is None
+    assert get_field_model(registry, other_widget, 'title') is not other_model
+
+    # Cached models are dropped together with the node and its widget
+    node = colander.SchemaNode(
+        colander.Mapping(), colander.SchemaNode(colander.String(), name='name')
+    )
+    get_field_model(registry, get_input_widgets(registry, node)['name'], 'name')
+    size = len(registry[FIELD_MODELS_CACHE_KEY])
+    del node
+    gc.collect()
+    assert len(registry[FIELD_MODELS_CACHE_KEY]) == size - 1
+
+    invalidate_admin_caches(registry)
+    assert FIELD_MODELS_CACHE_KEY not in registry
+    assert get_field_model(registry, widget, 'title') is not model
+
+
+def test_get_converter(pyramid_request, app_config):
+    registry = pyramid_request.registry
+    field_widget = ISchemaNodeToFieldWidget
+    assert get_converter(registry, colander.String(), field_widget) is string_field
+    # Converter of base class is used
+    assert get_converter(registry, Email(), field_widget) is string_field
+    assert get_converter(registry, colander.Tuple(), ISchemaNodeToInputWidget) is None
+
+    # Dispatch table is rebuilt after registration of new converter
+    app_config.add_field_converter(Email, email_field)
+    app_config.commit()
+    assert get_converter(registry, Email(), field_widget) is email_field
+    assert get_converter(registry, colander.String(), field_widget) is string_field
+
+
+def test_validators_are_converted_once(pyramid_request, app_config):
+    converted = []
+
+    def colors_validator(registry, validator: Colors):
+        converted.append(validator)
+        yield Choices(validator.choices)
+
+    add_validator_converter(app_config, Colors, colors_validator)
+    app_config.commit()
+    registry = pyramid_request.registry
+    node = colander.SchemaNode(
+        colander.String(),
+        name='color',
+        validator=colander.All(colander.Length(min=0), Colors(['red', 'green'])),
+    )
+    validators = get_validators(registry, node)
+    assert validators == [Required(), MinLength(0), Choices(['red', 'green'])]
+    assert len(converted) == 1
+
+    # Validators are converted once for select input and its converter
+    schema = colander.SchemaNode(colander.Mapping(), node)
+    widget = get_input_widgets(registry, schema)['color']
+    assert isinstance(widget, widgets.SelectInput)
+    assert len(converted) == 1
+    # Shared validators are not modified by converters
+    assert get_validators(registry, node) == validators
+
+    # New validator is converted again
+    node.validator = Colors(['blue'])
+    assert get_validators(registry, node) == [Required(), Choices(['blue'])]
+    assert len(converted) == 2
+
+
+def test_deep_schema(pyramid_request):
+    registry = pyramid_request.registry
+    # Depth of schema is not limited by the recursion limit
+    depth = sys.getrecursionlimit()
+    schema = make_deep_schema(depth)
+
+    def get_name(level):
+        if level < 0:
+            return 'value'
+        return f'sequence_{level}' if level % 2 else f'mapping_{level}'
+
+    top_name = get_name(depth - 1)
+    input_widget = get_input_widgets(registry, schema)[top_name]
+    field_widget = get_field_widgets(registry, schema)[top_name]
+
+    # Conversion into models and serialization are not limited too
+    for widget in (input_widget, field_widget):
+        model = get_field_model(registry, widget, top_name)
+        body = dumps(model)
+        for level in reversed(range(depth)):
+            assert model.source == get_name(level)
+            model = model.params['fields'][0]
+        assert model.source == 'value'
+        assert body.count('"source":"count"') == depth
+
+    for level in reversed(range(depth)):
+        if level % 2:
+            assert isinstance(input_widget, widgets.ArrayInput)
+            assert isinstance(field_widget, widgets.ArrayField)
+        else:
+            assert isinstance(input_widget, widgets.MappingInput)
+            assert isinstance(field_widget, widgets.MappingField)
+        name = get_name(level - 1)
+        assert list(input_widget.fields) == [name, 'count']
+        assert list(field_widget.fields) == [name, 'count']
+        input_widget = input_widget.fields[name]
+        field_widget = field_widget.fields[name]
+    assert isinstance(input_widget, widgets.TextInput)
+    assert isinstance(field_widget, widgets.TextField)
+
+
+def test_wide_schema(pyramid_request):
+    registry = pyramid_request.registry
+    schema = make_wide_schema(30)
+    input_widgets = get_input_widgets(registry, schema)
+    assert len(input_widgets) == 30
+    for widget in input_widgets.values():
+        assert list(widget.fields) == [f'field_{j}' for j in range(30)]
+        assert all(isinstance(w, widgets.TextInput) for w in widget.fields.values())
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import json
+import sys
+
+from ..fields import get_field_model, get_field_widgets
+from ..interning import REF_KEY, intern_models
+from ..models import CreateViewModel, EditViewModel, FieldModel, ValidatorModel
+from ..serializer import dumps
+from .benchmarks import make_deep_schema
+from .utils import resolve_refs
+
+
+def _address(source):
+    return FieldModel(
+        'MappingInput',
+        source,
+        {
+            'label': 'Address',
+            'fields': [
+                FieldModel('TextInput', 'city', {'label': 'City'}),
+                FieldModel(
+                    'TextInput',
+                    'street',
+                    {'label': 'Street'},
+                    [ValidatorModel('required')],
+                ),
+            ],
+        },
+    )
+
+
+def _colors():
+    return FieldModel(
+        'SelectInput',
+        'color',
+        {'choices': [{'id': c, 'name': c.title()} for c in ('red', 'green', 'blue')]},
+    )
+
+
+def test_intern_models():
+    value = {
+        'users': {
+            'create': CreateViewModel(
+                fields=[_address('home'), _address('work'), _colors()]
+            ),
+            'edit': EditViewModel(
+                fields=[_address('home'), _address('work'), _colors()]
+            ),
+        },
+        'cars': EditViewModel(fields=[_colors(), FieldModel('TextInput', 'name')]),
+    }
+    body, shared = intern_models(value)
+    # Shared subtrees are serialized once
+    assert len(body) + len(shared) < len(dumps(value))
+    body = json.loads(body)
+    shared = json.loads(shared)
+    assert resolve_refs(body, shared) == json.loads(dumps(value))
+
+    # The same fields of create and edit views are shared
+    create_fields = body['users']['create']['fields']
+    assert create_fields == body['users']['edit']['fields']
+    assert list(create_fields) == [REF_KEY]
+    # Nested fields and choices are shared between fields with different sources
+    home, work, colors = shared[create_fields[REF_KEY]]
+    assert home['source'] == 'home'
+    assert work['source'] == 'work'
+    assert home['params']['fields'] == work['params']['fields']
+    assert list(home['params']['fields']) == [REF_KEY]
+    assert colors == body['cars']['fields'][0]
+    assert list(colors) == [REF_KEY]
+
+    # Short subtrees are not shared
+    body, shared = intern_models(value, min_length=100500)
+    assert shared == '{}'
+    assert body == dumps(value)
+
+
+def test_intern_models_without_repeats():
+    value = [_address('home'), _colors()]
+    assert intern_models(value) == (dumps(value), '{}')
+
+
+def test_intern_deep_models(pyramid_request):
+    registry = pyramid_request.registry
+    # Depth of models is not limited by the recursion limit
+    depth = sys.getrecursionlimit()
+    widgets = get_field_widgets(registry, make_deep_schema(depth))
+    fields = [get_field_model(registry, w, name) for name, w in widgets.items()]
+    body, shared = intern_models({'home': fields, 'work': fields})
+    assert body == '{"home":{"$ref":"0"},"work":{"$ref":"0"}}'
+    # The field "count" of every level is shared
+    assert shared.count('"source":"count"') == 1
+    assert shared.count(f'{{"{REF_KEY}":"1"}}') == depth
+    assert shared.count('"source":"mapping_0"') == 1
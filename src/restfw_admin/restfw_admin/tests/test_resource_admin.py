@@ -12,12 +12,14 @@ from restfw.hal import HalResource
 from restfw.interfaces import MethodOptions
 
 from .. import widgets, widgets as all_widgets
+from ..fields import _get_node_origin
 from ..models import FieldModel, ValidatorModel
 from ..resource_admin import (
     Exclude,
     Only,
     ResourceAdmin,
     exclude_widgets,
+    get_filter_plan,
     only_widgets,
     replace_widgets,
     unflat,
@@ -25,46 +27,12 @@ from ..resource_admin import (
     Filters,
 )
 from ..resources import get_admin
-from ..validators import Required
-from ..widgets import WidgetOptions
+from .utils import Child, CreateUserSchema, Work, deferred_sex_validator
 
 
 # Users
 
 
-class Child(schemas.MappingNode):
-    sex = schemas.StringNode(
-        title='Sex',
-        validator=colander.OneOf(['m', 'f']),
-        widget_options=WidgetOptions(slug_to_title=False),
-    )
-    name = schemas.StringNode(title='Name')
-    age = schemas.UnsignedIntegerNode(title='Age', nullable=True)
-    toys = schemas.SequenceNode(
-        schemas.StringNode(title='Toy name'),
-        title='Toys',
-    )
-    birth_date = schemas.IntegerNode(
-        title='Birth date',
-        widget=(
-            widgets.DateField(show_time=True),
-            widgets.DateInput(validators=[Required()]),
-        ),
-    )
-
-
-class Work(schemas.MappingNode):
-    title = schemas.StringNode(
-        title='Title', validator=schemas.LaconicNoneOf(['God', 'Duck'])
-    )
-    address = schemas.StringNode(title='Address')
-
-
-def description_validator(node, value):
-    if value == 'Bad Guy':
-        raise colander.Invalid('Go to home, Bad Guy')
-
-
 class UserSchema(schemas.HalResourceSchema):
     id = schemas.UnsignedIntegerNode(title='ID')
     name = schemas.StringNode(title='User name')
@@ -88,12 +56,6 @@ class UsersSchema(schemas.HalResourceWithEmbeddedSchema):
     )
 
 
-@colander.deferred
-def deferred_sex_validator(node, kw):
-    request = kw['request']
-    return colander.OneOf(['m', 'f'])
-
-
 class GetUsersSchema(schemas.GetEmbeddedSchema):
     id = schemas.UnsignedIntegerNode(title='ID', missing=colander.drop)
     name = schemas.StringNode(title='User name', missing=colander.drop)
@@ -108,36 +70,6 @@ class GetUsersSchema(schemas.GetEmbeddedSchema):
     )
 
 
-class CreateUserSchema(schemas.MappingNode):
-    name = schemas.StringNode(
-        title='User name',
-        validator=colander.All(
-            colander.Length(max=50),
-            colander.Regex(r'^[a-zA-z0-9]+$'),
-            colander.luhnok,
-        ),
-    )
-    age = schemas.UnsignedIntegerNode(
-        title='Age',
-        nullable=True,
-        missing=colander.drop,
-    )
-    sex = schemas.StringNode(
-        title='Sex',
-        validator=deferred_sex_validator,
-        nullable=True,
-        missing=None,
-    )
-    description = schemas.EmptyStringNode(
-        title='Description', validator=description_validator, missing=''
-    )
-    children = schemas.SequenceNode(
-        Child(title='Child', missing=colander.drop),
-    )
-    current_work = Work(title='Current work')
-    previews_work = Work(title='Previews work', nullable=True, missing=None)
-
-
 class PatchItemSchema(schemas.MappingNode):
     name = schemas.StringNode(
         title='User name',
@@ -266,6 +198,8 @@ def test_only_widgets(widgets):
         'name': all_widgets.TextField(),
     }
     assert list(res.keys()) == ['child', 'parent', 'name']
+    # Source widgets are not modified
+    assert list(widgets['child'].fields) == ['name', 'sex', 'age']
 
 
 def test_exclude_widgets(widgets):
@@ -292,9 +226,60 @@ def test_exclude_widgets(widgets):
         ),
     }
     assert list(res.keys()) == ['name', 'child', 'parent']
+    # Source widgets are not modified
+    assert list(widgets['parent'].fields) == ['name', 'age', 'work']
+
+
+def test_filter_plan(widgets):
+    plan = get_filter_plan(
+        Only('parent.work.name', 'name', 'child'),
+        None,
+        Exclude('child.sex'),
+    )
+    # Plans are cached by values of specifications
+    assert (
+        get_filter_plan(
+            Only('parent.work.name', 'name', 'child'),
+            None,
+            Exclude('child.sex'),
+        )
+        is plan
+    )
+    # Only the first Only specification is used
+    assert (
+        get_filter_plan(
+            Only('parent.work.name', 'name', 'child'),
+            Only('phone'),
+            Exclude('child.sex'),
+        )
+        == plan
+    )
+
+    res = plan.apply(widgets, {'name': all_widgets.TextField(label='Name')})
+    assert res == {
+        'parent.work.name': all_widgets.TextField(),
+        'name': all_widgets.TextField(label='Name'),
+        'child': all_widgets.ArrayField(
+            fields={
+                'name': all_widgets.TextField(),
+                'age': all_widgets.NumberField(),
+            }
+        ),
+    }
+    # Source widgets are not modified
+    assert widgets['name'] == all_widgets.TextField()
+    assert list(widgets['child'].fields) == ['name', 'sex', 'age']
+
+    res = plan.apply(widgets, use_nested_array_field=True)
+    assert res['parent.work.name'] == all_widgets.NestedArrayField(
+        label=None,
+        fields={'': all_widgets.TextField()},
+        single_field=True,
+    )
 
 
 def test_replace_widgets(widgets):
+    child_widget = widgets['child']
     replaces = {
         'name': all_widgets.TextField(label='New name'),
         'child': {
@@ -333,6 +318,9 @@ def test_replace_widgets(widgets):
             }
         ),
     }
+    # Nested widgets are replaced by modified copies
+    assert widgets['child'] is not child_widget
+    assert list(child_widget.fields) == ['name', 'sex', 'age']
 
 
 def test_get_user_list_view(pyramid_request):
@@ -1018,6 +1006,25 @@ def test_get_user_edit_view(pyramid_request):
     assert fields == {'sex'}
 
 
+def test_schemas_are_bound_once(pyramid_request):
+    resource_admin = UsersAdmin(pyramid_request, 'users')
+    schema = resource_admin._get_schema_node(CreateUserSchema)
+    assert schema.bindings['request'] is pyramid_request
+    assert resource_admin._get_schema_node(CreateUserSchema) is schema
+    # Bound schema is cloned from the cached unbound instance
+    unbound = resource_admin._get_schema_node(CreateUserSchema, bind=False)
+    assert unbound.bindings is None
+    assert resource_admin._get_schema_node(CreateUserSchema, bind=False) is unbound
+    assert _get_node_origin(schema['current_work']) is unbound['current_work']
+    # Schemas without deferred values are bound too
+    schema = resource_admin._get_schema_node(Work)
+    assert schema.bindings['request'] is pyramid_request
+    assert schema['title'].bindings['request'] is pyramid_request
+    assert resource_admin._get_schema_node(Work) is schema
+    assert resource_admin._get_schema_node(Work, bind=False).bindings is None
+    assert resource_admin._get_schema_node(None) is None
+
+
 def test_api_info(web_app, pyramid_request, app_config):
     app_config.add_resource_admin(UsersAdmin, name='users')
     app_config.commit()
@@ -4,8 +4,22 @@
 :Date: 05.02.2020
 """
 
+import colander
+import pytest
+from restfw import schemas
+from restfw.interfaces import MethodOptions
+
+from ..admin import AdminChoicesAdmin
+from ..cache import API_INFO_CACHE_KEY, BUILD_EXECUTOR_KEY, invalidate_admin_caches
+from ..choices import (
+    ChoicesCacheStats,
+    get_choices_cache_stats,
+    invalidate_admin_choices,
+)
 from ..config import admin_choices_config
-from ..resources import get_admin_choices
+from ..resources import get_admin, get_admin_choices, get_admin_resources
+from ..schemas import AdminChoiceSchema
+from ..views import AdminChoiceView
 
 
 @admin_choices_config('product_types')
@@ -87,3 +101,280 @@ def test_admin_choices(web_app, pyramid_request, app_config):
     # res = web_app.get(url, params={'total_count': True, 'group': 'unknown'}, auth_token='admin')
     # assert res.headers['X-Total-Count'] == '0'
     # assert res.json['_embedded']['choices'] == []
+
+
+def test_admin_choices_cache(pyramid_request, app_config, monkeypatch):
+    calls = []
+
+    def get_colors(registry):
+        calls.append(1)
+        return [('red', 'Red'), ('green', 'Green')]
+
+    app_config.add_admin_choices(get_colors, 'colors', ttl=60)
+    app_config.add_admin_choices(get_colors, 'not_cached_colors')
+    app_config.commit()
+    registry = pyramid_request.registry
+    now = [1000.0]
+    monkeypatch.setattr('restfw_admin.choices._clock', lambda: now[0])
+    admin_choices = get_admin_choices(pyramid_request.root)
+
+    def get_ids(group):
+        return [c.model['id'] for c in admin_choices.get_choices(registry, group)]
+
+    assert get_ids('colors') == ['red', 'green']
+    assert get_ids('colors') == ['red', 'green']
+    assert len(calls) == 1
+    assert get_ids('not_cached_colors') == ['red', 'green']
+    assert get_ids('not_cached_colors') == ['red', 'green']
+    assert len(calls) == 3
+    assert get_choices_cache_stats(registry) == {
+        'colors': ChoicesCacheStats(ttl=60, hits=1, misses=1, size=2),
+    }
+
+    # Cached choices are expired after TTL
+    now[0] += 61
+    get_ids('colors')
+    assert len(calls) == 4
+
+    invalidate_admin_choices(registry, 'colors')
+    assert get_choices_cache_stats(registry)['colors'].size == 0
+    get_ids('colors')
+    assert len(calls) == 5
+    assert get_choices_cache_stats(registry)['colors'] == ChoicesCacheStats(
+        ttl=60, hits=1, misses=3, size=2
+    )
+
+    # Default TTL for all groups
+    monkeypatch.setitem(registry.settings, 'restfw_admin.choices_cache_ttl', '30')
+    get_ids('not_cached_colors')
+    get_ids('not_cached_colors')
+    assert len(calls) == 6
+    assert get_choices_cache_stats(registry)['not_cached_colors'].ttl == 30
+
+
+def test_admin_choice_lookup(pyramid_request, app_config):
+    calls = []
+
+    def get_colors(registry):
+        calls.append('colors')
+        return [('red', 'Red'), ('green', 'Green')]
+
+    def get_sizes(registry):
+        calls.append('sizes')
+        return [(1, 'Small'), (2, 'Large')]
+
+    app_config.add_admin_choices(get_colors, 'colors', ttl=60)
+    app_config.add_admin_choices(get_sizes, 'sizes')
+    app_config.commit()
+    admin_choices = get_admin_choices(pyramid_request.root)
+
+    choice = admin_choices['colors:green']
+    assert choice.__name__ == 'colors:green'
+    assert choice.model == {
+        'uniq_id': 'colors:green',
+        'group': 'colors',
+        'id': 'green',
+        'name': 'Green',
+    }
+    assert admin_choices['colors:red'].model['name'] == 'Red'
+    # Only provider of the given group is called
+    assert calls == ['colors']
+
+    # Ids of choices are compared as strings
+    assert admin_choices['sizes:2'].model['id'] == 2
+    assert calls == ['colors', 'sizes']
+    # Not cached choices are got from the provider for every lookup
+    assert admin_choices['sizes:1'].model['name'] == 'Small'
+    assert calls == ['colors', 'sizes', 'sizes']
+
+    for key in ('colors:blue', 'colors', 'unknown:red', ':red'):
+        with pytest.raises(KeyError):
+            admin_choices[key]
+
+
+class BigChoices:
+    def __init__(self, size):
+        self.size = size
+        self.calls = []
+
+    def __call__(self, registry):
+        self.calls.append('all')
+        return [(str(i), f'Item {i}') for i in range(self.size)]
+
+    def lookup(self, registry, ids):
+        self.calls.append(('lookup', ids))
+        return [(i, f'Item {i}') for i in ids if i.isdigit() and int(i) < self.size]
+
+    def page(self, registry, offset, limit):
+        self.calls.append(('page', offset, limit))
+        stop = min(offset + limit, self.size)
+        return [(str(i), f'Item {i}') for i in range(offset, stop)]
+
+    def count(self, registry):
+        self.calls.append('count')
+        return self.size
+
+
+def test_admin_choices_pushdown(pyramid_request, app_config):
+    provider = BigChoices(200_000)
+    app_config.add_admin_choices(provider, 'big')
+    app_config.commit()
+    registry = pyramid_request.registry
+    admin_choices = get_admin_choices(pyramid_request.root)
+
+    choices = admin_choices.get_choices_sequence(registry, 'big')
+    assert [c.model['id'] for c in choices[10:13]] == ['10', '11', '12']
+    assert provider.calls == [('page', 10, 3)]
+    assert len(choices) == 200_000
+    assert choices[-1].model['uniq_id'] == 'big:199999'
+    with pytest.raises(IndexError):
+        choices[200_000]
+
+    provider.calls.clear()
+    choices = admin_choices.get_choices_sequence(registry, 'big', ['7', 'x', '5', '7'])
+    assert [c.model['id'] for c in choices] == ['7', '5']
+    assert provider.calls == [('lookup', ['7', 'x', '5'])]
+
+    provider.calls.clear()
+    assert admin_choices['big:42'].model['name'] == 'Item 42'
+    assert provider.calls == [('lookup', ['42'])]
+
+    # Simple providers return full list of choices
+    app_config.add_admin_choices(lambda r: [('a', 'A'), ('b', 'B')], 'small')
+    app_config.commit()
+    choices = admin_choices.get_choices_sequence(registry, 'small', ['b'])
+    assert [c.model['id'] for c in choices] == ['b']
+    choices = admin_choices.get_choices_sequence(registry, 'small')
+    assert [c.model['id'] for c in choices] == ['a', 'b']
+    assert 'all' not in provider.calls
+
+
+def get_role(request):
+    return getattr(request, 'test_role', None)
+
+
+class RoleChoicesAdmin(AdminChoicesAdmin):
+    cache_vary = (get_role,)
+
+    @property
+    def extra(self):
+        return {'role': get_role(self._request)}
+
+
+@colander.deferred
+def deferred_role_title(node, kw):
+    return f'Name for {get_role(kw["request"])}'
+
+
+class RoleChoiceSchema(AdminChoiceSchema):
+    name = schemas.EmptyStringNode(title=deferred_role_title)
+
+
+class RoleChoiceView(AdminChoiceView):
+    options_for_get = MethodOptions(
+        None, RoleChoiceSchema, permission='admin_choices.get'
+    )
+
+
+class DeferredChoicesAdmin(AdminChoicesAdmin):
+    child_view_class = RoleChoiceView
+
+
+class NotCachedChoicesAdmin(AdminChoicesAdmin):
+    cache_vary = None
+
+
+def get_show_label(info, source):
+    for field in info.views.show.fields:
+        if field.source == source:
+            return field.params['label']
+
+
+def test_resource_info_cache_vary(pyramid_request, app_config):
+    app_config.add_resource_admin(RoleChoicesAdmin, name='role_choices')
+    app_config.add_resource_admin(DeferredChoicesAdmin, name='deferred_choices')
+    app_config.add_resource_admin(NotCachedChoicesAdmin, name='not_cached_choices')
+    app_config.commit()
+    admin_resources = get_admin_resources(pyramid_request.root)
+
+    resource = admin_resources['role_choices.json']
+    pyramid_request.test_role = 'admin'
+    admin_info = resource.get_compiled_info(pyramid_request)
+    assert admin_info.info.extra == {'role': 'admin'}
+    assert resource.get_compiled_info(pyramid_request) is admin_info
+
+    pyramid_request.test_role = 'user'
+    user_info = resource.get_compiled_info(pyramid_request)
+    assert user_info.info.extra == {'role': 'user'}
+    assert user_info.content_hash != admin_info.content_hash
+
+    pyramid_request.test_role = 'admin'
+    assert resource.get_compiled_info(pyramid_request) is admin_info
+
+    # Whole api_info is also cached by keys of resources
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert compiled.resources['role_choices'] is admin_info.info
+    pyramid_request.test_role = 'user'
+    assert (
+        api_info.get_compiled_info(pyramid_request).resources['role_choices']
+        is user_info.info
+    )
+
+    # Info is shared between requests only if it is declared explicitly
+    resource = admin_resources['admin_choices.json']
+    info = resource.get_compiled_info(pyramid_request)
+    assert resource.get_compiled_info(pyramid_request) is info
+    resource = admin_resources['not_cached_choices.json']
+    info = resource.get_compiled_info(pyramid_request)
+    assert resource.get_compiled_info(pyramid_request) is not info
+
+    # Info built from schemas with deferred values is not shared
+    # between requests even if it is declared
+    resource = admin_resources['deferred_choices.json']
+    pyramid_request.test_role = 'admin'
+    admin_info = resource.get_compiled_info(pyramid_request)
+    assert get_show_label(admin_info.info, 'name') == 'Name for admin'
+    assert resource.get_compiled_info(pyramid_request) is not admin_info
+    pyramid_request.test_role = 'user'
+    user_info = resource.get_compiled_info(pyramid_request)
+    assert get_show_label(user_info.info, 'name') == 'Name for user'
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert get_show_label(compiled.resources['deferred_choices'], 'name') == (
+        'Name for user'
+    )
+
+
+def test_parallel_build(pyramid_request, app_config, monkeypatch):
+    for i in range(5):
+        app_config.add_resource_admin(AdminChoicesAdmin, name=f'choices_{i}')
+    app_config.commit()
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    sequential = api_info.get_resources_info(pyramid_request)
+
+    monkeypatch.setitem(
+        pyramid_request.registry.settings, 'restfw_admin.build_workers', '4'
+    )
+    parallel = api_info.get_resources_info(pyramid_request)
+    assert list(parallel) == list(sequential)
+    assert parallel == sequential
+
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert list(compiled.resources) == list(sequential)
+    assert list(compiled.resources.values()) == list(sequential.values())
+
+    # Thread pool is reused by next builds
+    registry = pyramid_request.registry
+    executor = registry[BUILD_EXECUTOR_KEY]
+    invalidate_admin_caches(registry)
+    api_info.get_compiled_info(pyramid_request)
+    assert registry[BUILD_EXECUTOR_KEY] is executor
+
+    # Cached resources are not built again
+    registry.pop(API_INFO_CACHE_KEY)
+
+    def build_all(*args):
+        raise AssertionError('All resources must be taken from the cache')
+
+    monkeypatch.setattr('restfw_admin.resources.build_all', build_all)
+    assert api_info.get_compiled_info(pyramid_request).resources == (compiled.resources)
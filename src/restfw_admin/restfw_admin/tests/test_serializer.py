@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import dataclasses
+import enum
+import json
+
+import pytest
+
+from ..models import (
+    ApiInfoModel,
+    FieldModel,
+    ListViewModel,
+    ResourceInfoModel,
+    ShowViewModel,
+    ValidatorModel,
+    ViewsModel,
+)
+from ..serializer import RawJson, dumps, prerender
+
+
+class Color(str, enum.Enum):
+    red = 'red'
+
+
+class Level(enum.IntEnum):
+    high = 10
+
+
+def _get_api_info_model() -> ApiInfoModel:
+    name_field = FieldModel(
+        type='TextInput',
+        source='name',
+        params={'label': 'Имя', 'color': Color.red, 'level': Level.high},
+        validators=[ValidatorModel('minLength', (1,)), ValidatorModel('required')],
+    )
+    mapping_field = FieldModel(
+        type='MappingField',
+        source='work',
+        params={
+            'fields': [name_field, FieldModel('NumberField', 'rate', {'step': 0.5})],
+            'choices': [{'id': 1, 'name': 'One'}, {'id': None, 'name': ''}],
+        },
+        id=None,
+    )
+    views = ViewsModel(
+        list=ListViewModel(fields=[name_field, mapping_field], filters=None),
+        show=ShowViewModel(fields=[mapping_field]),
+    )
+    resource = ResourceInfoModel(
+        index=1,
+        name='users',
+        title='Users',
+        location='/users',
+        id_field='id',
+        embedded_name='users',
+        update_method='PATCH',
+        deletable=True,
+        order_by=['name'],
+        views=views,
+        extra={'flag': False, 1: 'int key'},
+    )
+    return ApiInfoModel(
+        root_url='http://localhost',
+        title='Admin UI',
+        resources={'users': resource},
+        extra={'nan': float('nan'), 'inf': float('inf')},
+    )
+
+
+def test_dumps_is_equal_to_asdict():
+    model = _get_api_info_model()
+    # Pre-rendered JSON of models is not serialized
+    expected = json.dumps(
+        dataclasses.asdict(
+            model,
+            dict_factory=lambda items: {k: v for k, v in items if k != 'fragment'},
+        ),
+        separators=(',', ':'),
+    )
+    assert dumps(model) == expected
+
+
+def test_dumps_prerendered_model():
+    model = _get_api_info_model()
+    expected = dumps(model)
+    for field in model.resources['users'].views.list.fields:
+        prerender(field)
+        assert field.fragment is not None
+    assert dumps(model) == expected
+    # Pre-rendered JSON is written as is
+    field.fragment = '{}'
+    assert dumps(model) != expected
+
+    with pytest.raises(TypeError, match='does not have raw JSON field'):
+        prerender(ValidatorModel('required'))
+
+
+def test_dumps_raw_json():
+    body = dumps({'a': RawJson('{"b":[1,2]}'), 'c': [RawJson('null')]})
+    assert body == '{"a":{"b":[1,2]},"c":[null]}'
+
+
+def test_dumps_unsupported_type():
+    with pytest.raises(TypeError, match='is not JSON serializable'):
+        dumps({'a': {1, 2}})
+    with pytest.raises(TypeError, match='keys must be str'):
+        dumps({(1, 2): 'a'})
@@ -4,12 +4,17 @@
 :Date: 06.08.2020
 """
 
+import gzip
+import json
+
 import pytest
 from cykooz.testing import D
 
+from ..admin import AdminChoicesAdmin
 from ..config import set_restfw_admin_extra_params
 from ..resources import get_admin
 from ..views import admin_ui
+from .utils import resolve_refs
 
 
 @pytest.fixture(name='pyramid_settings', scope='session')
@@ -60,3 +65,149 @@ def test_api_info(web_app, pyramid_request):
             'bar': 'http://admin.go',
         },
     }
+
+
+def test_api_info_is_compiled_once(pyramid_request, app_config):
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    compiled = api_info.get_compiled_info(pyramid_request)
+    assert list(compiled.resources) == ['admin_choices']
+    assert api_info.get_compiled_info(pyramid_request) is compiled
+
+    # Registration of a new resource admin resets compiled api_info
+    app_config.add_resource_admin(AdminChoicesAdmin, name='other_choices')
+    app_config.commit()
+    new_compiled = api_info.get_compiled_info(pyramid_request)
+    assert new_compiled is not compiled
+    assert set(new_compiled.resources) == {'admin_choices', 'other_choices'}
+    assert new_compiled.resources['other_choices'].name == 'other_choices'
+
+
+def test_api_info_etag(web_app, pyramid_request):
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    url = pyramid_request.resource_url(api_info)
+    res = web_app.get(url)
+    etag = res.headers['ETag']
+    assert etag.startswith('"')
+
+    res = web_app.get(url, headers={'If-None-Match': etag}, status=304)
+    assert res.body == b''
+    assert res.headers['ETag'] == etag
+
+    # ETag depends on request-dependent parts of api_info
+    set_restfw_admin_extra_params(pyramid_request.registry, {'foo': 1})
+    res = web_app.get(url, headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.headers['ETag'] != etag
+    assert res.json['extra'] == {'foo': 1}
+
+
+def test_api_info_without_cache(web_app, pyramid_request, monkeypatch):
+    monkeypatch.setitem(
+        pyramid_request.registry.settings, 'restfw_admin.cache_api_info', 'false'
+    )
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    compiled_count = 0
+    compile_info = type(api_info)._compile
+
+    def _compile(self, *args, **kwargs):
+        nonlocal compiled_count
+        compiled_count += 1
+        return compile_info(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(api_info), '_compile', _compile)
+    res = web_app.get(pyramid_request.resource_url(api_info))
+    assert 'admin_choices' in res.json['resources']
+    # ETag and body are built from the same compiled info
+    assert compiled_count == 1
+
+
+def test_api_info_index_mode(web_app, pyramid_request):
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    url = pyramid_request.resource_url(api_info)
+    res = web_app.get(url, params={'mode': 'index'})
+    resources = res.json['resources']
+    assert resources == {
+        'admin_choices': {
+            'index': 0,
+            'name': 'admin_choices',
+            'title': 'Admin Choices',
+            'location': '/backend_admin/choices/',
+            'id_field': 'uniq_id',
+            'embedded_name': 'choices',
+            'update_method': '',
+            'deletable': False,
+            'order_by': [],
+            'extra': {},
+            'has_list_view': False,
+            'info_location': '/backend_admin/resources/admin_choices.json',
+        }
+    }
+
+    info_url = res.json['root_url'] + resources['admin_choices']['info_location']
+    res = web_app.get(info_url)
+    assert res.json == D(
+        {
+            'name': 'admin_choices',
+            'title': 'Admin Choices',
+            'views': D({'list': None, 'show': D()}),
+        }
+    )
+    etag = res.headers['ETag']
+    web_app.get(info_url, headers={'If-None-Match': etag}, status=304)
+
+    full_res = web_app.get(url)
+    assert full_res.json['resources']['admin_choices'] == D(
+        {'views': res.json['views']}
+    )
+
+    web_app.get(
+        pyramid_request.resource_url(get_admin(pyramid_request.root)['resources'])
+        + 'unknown.json',
+        status=404,
+    )
+
+
+def test_api_info_shared_mode(web_app, pyramid_request, app_config):
+    app_config.add_resource_admin(AdminChoicesAdmin, name='other_choices')
+    app_config.commit()
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    url = pyramid_request.resource_url(api_info)
+    full_res = web_app.get(url)
+    assert 'shared' not in full_res.json
+
+    res = web_app.get(url, params={'mode': 'shared'})
+    assert res.headers['ETag'] != full_res.headers['ETag']
+    shared = res.json['shared']
+    assert shared
+    assert resolve_refs(res.json['resources'], shared) == full_res.json['resources']
+    assert len(res.body) < len(full_res.body)
+    web_app.get(
+        url,
+        params={'mode': 'shared'},
+        headers={'If-None-Match': res.headers['ETag']},
+        status=304,
+    )
+
+
+def test_api_info_compression(web_app, pyramid_request):
+    api_info = get_admin(pyramid_request.root)['api_info.json']
+    url = pyramid_request.resource_url(api_info)
+    plain_res = web_app.get(url)
+    assert plain_res.headers['Vary'] == 'Accept-Encoding'
+    assert 'Content-Encoding' not in plain_res.headers
+
+    res = web_app.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert res.headers['Vary'] == 'Accept-Encoding'
+    assert res.headers['ETag'] == plain_res.headers['ETag'][:-1] + '-gzip"'
+    assert json.loads(gzip.decompress(res.body)) == plain_res.json
+
+    # Compressed body is cached
+    res2 = web_app.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert res2.body == res.body
+
+    web_app.get(
+        url,
+        headers={'Accept-Encoding': 'gzip', 'If-None-Match': res.headers['ETag']},
+        status=304,
+    )
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import dataclasses
+import tracemalloc
+
+from .. import models, widgets
+from ..validators import MaxLength, Required
+
+
+def _get_concrete_classes(module, base):
+    return [
+        cls
+        for cls in vars(module).values()
+        if isinstance(cls, type) and issubclass(cls, base) and 'type' in vars(cls)
+    ]
+
+
+def test_widgets_have_slots():
+    for cls in _get_concrete_classes(widgets, widgets.Widget):
+        assert '__dict__' not in dir(cls), cls
+    for cls in (models.FieldModel, models.ValidatorModel, models.ShowViewModel):
+        assert '__dict__' not in dir(cls), cls
+
+
+def _make_dict_based_class(cls):
+    """Returns an equivalent of dataclass without __slots__."""
+    return dataclasses.make_dataclass(
+        f'Dict{cls.__name__}',
+        [(f.name, f.type, f) for f in dataclasses.fields(cls)],
+    )
+
+
+def _measure(factory, count=2000) -> int:
+    tracemalloc.start()
+    try:
+        snapshot = tracemalloc.take_snapshot()
+        objects = [factory(i) for i in range(count)]
+        size = sum(
+            stat.size_diff
+            for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        )
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size
+
+
+def test_memory_usage():
+    dict_text_input = _make_dict_based_class(widgets.TextInput)
+    dict_field_model = _make_dict_based_class(models.FieldModel)
+    dict_validator_model = _make_dict_based_class(models.ValidatorModel)
+    validators = [Required(), MaxLength(50)]
+
+    def make_widgets(text_input_class):
+        return lambda i: text_input_class(label=f'Field {i}', validators=validators)
+
+    def make_models(field_model_class, validator_model_class):
+        return lambda i: field_model_class(
+            type='TextInput',
+            source=f'field_{i}',
+            params={},
+            validators=[validator_model_class('required', ())],
+            id=None,
+        )
+
+    assert _measure(make_widgets(widgets.TextInput)) < _measure(
+        make_widgets(dict_text_input)
+    )
+    assert _measure(make_models(models.FieldModel, models.ValidatorModel)) < _measure(
+        make_models(dict_field_model, dict_validator_model)
+    )
+
+
+def test_field_names_are_precomputed():
+    names = widgets._get_field_names(widgets.TextInput)
+    assert names is widgets._get_field_names(widgets.TextInput)
+    assert ('input_type', 'type') in names
+    assert ('validators', 'validators') in names
+    # Validators are not passed into params of model
+    assert ('validators', 'validators') not in widgets._get_params_names(
+        widgets.TextInput
+    )
+
+    widget = widgets.TextInput(input_type='email', validators=[Required()])
+    assert widget.get_fields() == {
+        'input_type': 'email',
+        'validators': [Required()],
+    }
+    model = widget.to_model('email')
+    assert model.params == {'type': 'email', 'label': 'Email'}
+    assert model.validators == [models.ValidatorModel('required', ())]
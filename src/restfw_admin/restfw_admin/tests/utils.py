@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import colander
+from restfw import schemas
+
+from .. import widgets
+from ..interning import REF_KEY
+from ..validators import Required
+from ..widgets import WidgetOptions
+
+
+def resolve_refs(value, shared):
+    """Replaces references to shared subtrees in deserialized JSON
+    by the subtrees themselves."""
+    if isinstance(value, list):
+        return [resolve_refs(item, shared) for item in value]
+    if isinstance(value, dict):
+        if list(value) == [REF_KEY]:
+            return resolve_refs(shared[value[REF_KEY]], shared)
+        return {key: resolve_refs(item, shared) for key, item in value.items()}
+    return value
+
+
+# Users
+
+
+class Child(schemas.MappingNode):
+    sex = schemas.StringNode(
+        title='Sex',
+        validator=colander.OneOf(['m', 'f']),
+        widget_options=WidgetOptions(slug_to_title=False),
+    )
+    name = schemas.StringNode(title='Name')
+    age = schemas.UnsignedIntegerNode(title='Age', nullable=True)
+    toys = schemas.SequenceNode(
+        schemas.StringNode(title='Toy name'),
+        title='Toys',
+    )
+    birth_date = schemas.IntegerNode(
+        title='Birth date',
+        widget=(
+            widgets.DateField(show_time=True),
+            widgets.DateInput(validators=[Required()]),
+        ),
+    )
+
+
+class Work(schemas.MappingNode):
+    title = schemas.StringNode(
+        title='Title', validator=schemas.LaconicNoneOf(['God', 'Duck'])
+    )
+    address = schemas.StringNode(title='Address')
+
+
+def description_validator(node, value):
+    if value == 'Bad Guy':
+        raise colander.Invalid('Go to home, Bad Guy')
+
+
+@colander.deferred
+def deferred_sex_validator(node, kw):
+    request = kw['request']
+    return colander.OneOf(['m', 'f'])
+
+
+class CreateUserSchema(schemas.MappingNode):
+    name = schemas.StringNode(
+        title='User name',
+        validator=colander.All(
+            colander.Length(max=50),
+            colander.Regex(r'^[a-zA-z0-9]+$'),
+            colander.luhnok,
+        ),
+    )
+    age = schemas.UnsignedIntegerNode(
+        title='Age',
+        nullable=True,
+        missing=colander.drop,
+    )
+    sex = schemas.StringNode(
+        title='Sex',
+        validator=deferred_sex_validator,
+        nullable=True,
+        missing=None,
+    )
+    description = schemas.EmptyStringNode(
+        title='Description', validator=description_validator, missing=''
+    )
+    children = schemas.SequenceNode(
+        Child(title='Child', missing=colander.drop),
+    )
+    current_work = Work(title='Current work')
+    previews_work = Work(title='Previews work', nullable=True, missing=None)
@@ -15,6 +15,7 @@ from restfw import schemas
 from zope.interface import implementer
 
 from . import interfaces
+from .cache import get_admin_config_version, invalidate_admin_caches
 from .typing import ColanderNode, ColanderValidator
 from .validators import (
     Choices,
@@ -50,11 +51,44 @@ class _FunctionBasedValidator:
         self.__call__ = validator
 
 
+# Name of attribute of colander's node to store converted validators
+_VALIDATORS_ATTR = '_restfw_admin_validators'
+
+
 def get_validators(registry: Registry, node: ColanderNode) -> List[Validator]:
+    """Returns validators converted from the validator of colander's node.
+
+    The result of conversion is stored in the node and is reused while
+    the validator object, the ``missing`` value of node, the registry and
+    the version of admin configuration are the same. So every validator
+    is converted once per build of a view, even if it is requested
+    by several converters.
+    """
+    validator = node.validator
+    is_required = node.missing is colander.required
+    version = get_admin_config_version(registry)
+    cached = node.__dict__.get(_VALIDATORS_ATTR)
+    if (
+        cached is not None
+        and cached[0] is registry
+        and cached[1] == version
+        and cached[2] is validator
+        and cached[3] == is_required
+    ):
+        # Callers may add validators into the list
+        return list(cached[4])
+
     validators = []
-    if node.missing is colander.required:
+    if is_required:
         validators.append(Required())
-    validators.extend(convert_validators(registry, node.validator))
+    validators.extend(convert_validators(registry, validator))
+    node.__dict__[_VALIDATORS_ATTR] = (
+        registry,
+        version,
+        validator,
+        is_required,
+        tuple(validators),
+    )
     return validators
 
 
@@ -118,6 +152,7 @@ def add_validator_converter(
             provided=interfaces.IValidatorConverter,
             name=adapter_name,
         )
+        invalidate_admin_caches(config.registry)
 
     config.action(discriminator, register, introspectables=(intr,))
     return converter
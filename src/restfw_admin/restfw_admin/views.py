@@ -4,17 +4,29 @@
 :Date: 18.07.2020
 """
 
-import dataclasses
+import hashlib
+import json
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
 
-from pyramid.httpexceptions import HTTPMovedPermanently, HTTPOk
+from pyramid.httpexceptions import HTTPMovedPermanently, HTTPNotModified, HTTPOk
 from restfw import views
 from restfw.interfaces import MethodOptions
 from restfw.typing import PyramidRequest
 
 from . import schemas
+from .compression import get_best_encoding, get_encoded_body
 from .config import get_admin_ui_settings
-from .models import ApiInfoModel
-from .resources import Admin, AdminChoices, ApiInfo, get_admin, AdminChoice
+from .resources import (
+    Admin,
+    AdminChoice,
+    AdminChoices,
+    ApiInfo,
+    CompiledApiInfo,
+    CompiledResourceInfo,
+    ResourceInfo,
+    get_admin,
+)
+from .serializer import RawJson, dumps
 
 
 TEMPLATE = """<script>
@@ -66,25 +78,204 @@ def redirect_to_admin_ui(request: PyramidRequest):
 # ApiInfo
 
 
+# Part of JSON body - a serialized string or UTF-8 encoded bytes
+# (e.g. a memoryview of offline compiled artifact).
+BodyPart = Union[str, bytes, memoryview]
+
+# Size of chunks of not compressed body sent to the client
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+def _conditional_json_response(
+    request: PyramidRequest, etag: str, get_body_parts: Callable[[], List[BodyPart]]
+):
+    """Returns "304 Not Modified" response if the client already has
+    an actual version of document. Otherwise, returns a response with
+    the body compressed by the best content-coding acceptable by client.
+    Compressed bodies are cached by ETag.
+
+    Not compressed body is sent by chunks, so memory-mapped parts
+    of it are never copied into memory of process entirely.
+    """
+    encoding = get_best_encoding(request)
+    if encoding:
+        # Different representations must have different strong ETags
+        etag = f'{etag}-{encoding}'
+    if etag in request.if_none_match:
+        response = HTTPNotModified()
+    else:
+        response = request.response
+        response.content_type = 'application/json'
+        if encoding:
+            response.body = get_encoded_body(
+                request.registry,
+                etag,
+                encoding,
+                lambda: b''.join(_encode_parts(get_body_parts())),
+            )
+            response.content_encoding = encoding
+        else:
+            parts = list(_encode_parts(get_body_parts()))
+            response.app_iter = _iter_chunks(parts)
+            response.content_length = sum(len(part) for part in parts)
+    response.etag = etag
+    response.vary = ('Accept-Encoding',)
+    return response
+
+
+def _encode_parts(parts: Iterable[BodyPart]) -> Iterator[Union[bytes, memoryview]]:
+    for part in parts:
+        yield part.encode('utf-8') if isinstance(part, str) else part
+
+
+def _iter_chunks(parts: Iterable[Union[bytes, memoryview]]) -> Iterator[bytes]:
+    for part in parts:
+        if isinstance(part, bytes):
+            yield part
+            continue
+        for offset in range(0, len(part), BODY_CHUNK_SIZE):
+            yield bytes(part[offset : offset + BODY_CHUNK_SIZE])
+
+
+# It can't be a part of serialized JSON, because
+# control characters are escaped in JSON strings.
+_RAW_PART_PLACEHOLDER = '\x00'
+
+
+def _join_body_parts(value: dict, raw_parts: Sequence[BodyPart]) -> List[BodyPart]:
+    """Serializes the value and inserts the given already serialized parts
+    instead of placeholders."""
+    parts = []
+    for i, chunk in enumerate(dumps(value).split(_RAW_PART_PLACEHOLDER)):
+        if i:
+            parts.append(raw_parts[i - 1])
+        parts.append(chunk)
+    return parts
+
+
 @views.resource_view_config()
 class ApiInfoView(views.HalResourceView):
+    """Returns information about all registered resource admins.
+
+    Use "mode=index" query parameter to get only short information
+    about resources, without views. Full information about a resource
+    can be got later from the location specified in "info_location".
+
+    Use "mode=shared" query parameter to get identical subtrees of fields
+    and lists of choices once in "shared" section. Every occurrence of them
+    in resources is replaced by a reference - {"$ref": "<id in shared>"}.
+    """
+
     resource: ApiInfo
     options_for_get = MethodOptions(None, None, permission='rest_admin.api_info.get')
 
+    def http_get(self):
+        # Compiled info is got once, because it may be not cached
+        compiled = self.get_compiled_info()
+        return _conditional_json_response(
+            self.request,
+            self.get_etag(compiled),
+            lambda: self.get_body_parts(compiled),
+        )
+
+    @property
+    def index_only(self) -> bool:
+        return self.request.GET.get('mode') == 'index'
+
+    @property
+    def shared_fields(self) -> bool:
+        return self.request.GET.get('mode') == 'shared'
+
+    def get_compiled_info(self) -> CompiledApiInfo:
+        return self.resource.get_compiled_info(
+            self.request, self.index_only, self.shared_fields
+        )
+
+    def get_etag(self, compiled: Optional[CompiledApiInfo] = None) -> str:
+        """Returns a strong ETag of api_info. It is calculated from
+        the hash of compiled resources and the request-dependent params,
+        so the whole document is not serialized to build it."""
+        if compiled is None:
+            compiled = self.get_compiled_info()
+        root_url, title, extra = self._get_params()
+        parts = (
+            compiled.content_hash,
+            self.request.application_url,
+            root_url,
+            title,
+            json.dumps(extra, sort_keys=True, default=str),
+        )
+        return hashlib.md5('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def get_body(self, compiled: Optional[CompiledApiInfo] = None) -> str:
+        """Returns serialized api_info."""
+        parts = _encode_parts(self.get_body_parts(compiled))
+        return b''.join(parts).decode('utf-8')
+
+    def get_body_parts(
+        self, compiled: Optional[CompiledApiInfo] = None
+    ) -> List[BodyPart]:
+        """Returns parts of serialized api_info. Only a request-dependent
+        part of ApiInfoModel is serialized here, resources are taken from
+        the compiled snapshot as already serialized JSON without copying."""
+        root_url, title, extra = self._get_params()
+        if compiled is None:
+            compiled = self.get_compiled_info()
+        raw_parts = [compiled.resources_body]
+        body = {
+            '_links': {'self': {'href': self.request.resource_url(self.resource)}},
+            'root_url': root_url,
+            'title': title,
+            'resources': RawJson(_RAW_PART_PLACEHOLDER),
+            'extra': extra,
+        }
+        if compiled.shared_body is not None:
+            raw_parts.append(compiled.shared_body)
+            body['shared'] = RawJson(_RAW_PART_PLACEHOLDER)
+        return _join_body_parts(body, raw_parts)
+
     def as_dict(self):
+        res = json.loads(self.get_body())
+        del res['_links']
+        return res
+
+    def _get_params(self):
         registry = self.request.registry
         title = registry.settings.get('restfw_admin.title', 'Admin UI')
         root_url = registry.settings.get('restfw_admin.root_url', '')
         extra = registry.get('restfw_admin.extra', {})
         if not root_url:
             root_url = self.request.resource_url(self.request.root)
-        model = ApiInfoModel(
-            root_url=root_url.rstrip('/'),
-            title=title,
-            resources=self.resource.get_resources_info(self.request),
-            extra=extra,
+        return root_url.rstrip('/'), title, extra
+
+
+@views.resource_view_config()
+class ResourceInfoView(views.HalResourceView):
+    """Returns full information about one resource admin."""
+
+    resource: ResourceInfo
+    options_for_get = MethodOptions(None, None, permission='rest_admin.api_info.get')
+
+    def http_get(self):
+        compiled = self.resource.get_compiled_info(self.request)
+        etag = hashlib.md5(
+            f'{compiled.content_hash}\n{self.request.application_url}'.encode('utf-8')
+        ).hexdigest()
+        return _conditional_json_response(
+            self.request, etag, lambda: [self.get_body(compiled)]
         )
-        return dataclasses.asdict(model)
+
+    def get_body(self, compiled: Optional[CompiledResourceInfo] = None) -> str:
+        if compiled is None:
+            compiled = self.resource.get_compiled_info(self.request)
+        links = dumps({'self': {'href': self.request.resource_url(self.resource)}})
+        # Insert "_links" as the first field of serialized ResourceInfoModel
+        return f'{{"_links":{links},{compiled.body[1:]}'
+
+    def as_dict(self):
+        res = json.loads(self.get_body())
+        del res['_links']
+        return res
 
 
 # AdminChoices
@@ -115,8 +306,8 @@ class AdminChoicesView(views.HalResourceWithEmbeddedView):
     def get_embedded(self, params):
         group = params.get('group')
         choice_ids = params.get('id')
-        choices = list(
-            self.resource.get_choices(self.request.registry, group, choice_ids)
+        choices = self.resource.get_choices_sequence(
+            self.request.registry, group, choice_ids
         )
         return views.list_to_embedded_resources(
             self.request,
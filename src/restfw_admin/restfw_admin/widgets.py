@@ -4,6 +4,9 @@
 :Date: 04.07.2020
 """
 
+import dataclasses
+import functools
+import threading
 from dataclasses import dataclass, field, fields
 from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple, Union
 
@@ -22,9 +25,112 @@ def ra_field(name, **kwargs):
     return field(metadata={'ra_name': name}, **kwargs)
 
 
+def _slotted(cls):
+    """Creates a dataclass with ``__slots__`` from the given class.
+
+    Base classes of widgets have empty ``__slots__`` and only concrete
+    widgets have slots for all its fields, so they can be combined with
+    multiple inheritance without conflicts of instances layout.
+    """
+    slotted_cls = dataclass(cls, slots=True)
+    # dataclass() creates a new class, so fix references to the old class
+    # used by zero-argument form of super() in methods.
+    for value in slotted_cls.__dict__.values():
+        func = getattr(value, '__func__', value)
+        for cell in getattr(func, '__closure__', None) or ():
+            try:
+                if cell.cell_contents is cls:
+                    cell.cell_contents = slotted_cls
+            except ValueError:  # empty cell
+                pass
+    return slotted_cls
+
+
+@functools.cache
+def _get_field_names(cls: type) -> Tuple[Tuple[str, str], ...]:
+    """Returns pairs of names of fields of the widget class and names
+    of corresponding properties of ReactAdmin's component."""
+    return tuple((f.name, f.metadata.get('ra_name', f.name)) for f in fields(cls))
+
+
+@functools.cache
+def _get_params_names(cls: type) -> Tuple[Tuple[str, str], ...]:
+    """Returns the same pairs as ``_get_field_names()`` without fields
+    which are not passed into params of model as is."""
+    return tuple(
+        (name, ra_name)
+        for name, ra_name in _get_field_names(cls)
+        if name not in cls._params_exclude
+    )
+
+
+# Sub-widgets nested deeper than this are converted into models
+# without recursion, so the depth of widgets is not limited
+# by the recursion limit.
+_MAX_RECURSION_DEPTH = 32
+
+
+class _ConversionState(threading.local):
+    def __init__(self):
+        self.depth = 0
+        # Sub-widgets which models are not converted yet:
+        # (placeholder of model, widget, field_name)
+        self.pending: List[Tuple[FieldModel, Widget, Optional[str]]] = []
+
+
+_conversion = _ConversionState()
+
+
+def _sub_model(widget: 'Widget', field_name: Optional[str]) -> FieldModel:
+    """Converts the sub-widget into a model. Too deeply nested sub-widgets
+    are replaced by placeholders, which are filled by the outermost call
+    of this function after conversion of their parents."""
+    state = _conversion
+    if state.depth >= _MAX_RECURSION_DEPTH:
+        placeholder = FieldModel(type=widget.type, source=field_name)
+        state.pending.append((placeholder, widget, field_name))
+        return placeholder
+    state.depth += 1
+    try:
+        model = widget.to_model(field_name)
+    finally:
+        state.depth -= 1
+    if state.depth == 0 and state.pending:
+        _convert_pending(state)
+    return model
+
+
+def _convert_pending(state: _ConversionState):
+    pending = state.pending
+    state.depth = 1
+    try:
+        while pending:
+            placeholder, widget, field_name = pending.pop()
+            # Sub-widgets of the widget may be added into the pending list
+            model = widget.to_model(field_name)
+            for f in dataclasses.fields(model):
+                setattr(placeholder, f.name, getattr(model, f.name))
+    finally:
+        state.depth = 0
+        pending.clear()
+
+
 @dataclass()
 class Widget:
+    """Base class of widgets.
+
+    Widgets may be shared between resources, requests and threads
+    (e.g. widgets from ``widget`` attribute of schema nodes or cached
+    results of conversion), so they must not be modified in place.
+    Use ``replace()`` to get a modified copy.
+    """
+
+    __slots__ = ()
+
     type: ClassVar[str]
+    # Names of fields that must not be added into params of model
+    # by Widget.to_model(), subclasses convert them by itself.
+    _params_exclude: ClassVar[Tuple[str, ...]] = ()
     label: Optional[str] = None
     # A class name (usually generated by JSS) to customize
     # the look and feel of the field element itself.
@@ -36,26 +142,41 @@ class Widget:
 
     def to_model(self, field_name: Optional[str]) -> FieldModel:
         params = {}
-        for f in fields(self):
-            value = getattr(self, f.name)
-            if value is None:
-                continue
-            name = f.metadata.get('ra_name', f.name)
-            params[name] = value
+        for name, ra_name in _get_params_names(self.__class__):
+            value = getattr(self, name)
+            if value is not None:
+                params[ra_name] = value
         if 'label' not in params and field_name:
             params['label'] = slug_to_title(field_name)
         return FieldModel(type=self.type, source=field_name, params=params)
 
     def get_fields(self) -> Dict[str, Any]:
         return {
-            f.name: value
-            for f in fields(self)
-            if (value := getattr(self, f.name)) is not None
+            name: value
+            for name, _ in _get_field_names(self.__class__)
+            if (value := getattr(self, name)) is not None
         }
 
+    def replace(self, **changes):
+        """Returns a copy of the widget with given fields replaced by new values.
+        Returns the widget itself if nothing is changed.
+
+        >>> widget = TextField(label='Name')
+        >>> widget.replace(label='Name') is widget
+        True
+        >>> new_widget = widget.replace(label='Title')
+        >>> new_widget.label, widget.label
+        ('Title', 'Name')
+        """
+        if all(getattr(self, name) is value for name, value in changes.items()):
+            return self
+        return dataclasses.replace(self, **changes)
+
 
 @dataclass()
 class FieldWidget(Widget):
+    __slots__ = ()
+
     # When used in a List, should the list be sortable using
     # the source attribute? Setting it to false disables
     # the click handler on the column header.
@@ -84,6 +205,9 @@ class FieldWidget(Widget):
 
 @dataclass()
 class InputWidget(Widget):
+    __slots__ = ()
+
+    _params_exclude = ('validators',)
     # Value to be set when the property is undefined.
     default_value: Optional[Json] = ra_field('defaultValue')
     # Validation rules for the current property.
@@ -97,20 +221,20 @@ class InputWidget(Widget):
         field_model = super().to_model(field_name)
         if self.validators:
             field_model.validators = [v.to_model() for v in self.validators]
-        field_model.params.pop('validators', None)
         return field_model
 
 
+@_slotted
 class TextField(FieldWidget):
     type = 'TextField'
 
 
-@dataclass()
+@_slotted
 class NullableTextField(TextField):
     type = 'NullableTextField'
 
 
-@dataclass()
+@_slotted
 class TextInput(InputWidget):
     type = 'TextInput'
     # If True, display a button to reset the changes in this input value.
@@ -120,23 +244,24 @@ class TextInput(InputWidget):
     multiline: Optional[bool] = None
 
 
-@dataclass()
+@_slotted
 class NullableTextInput(TextInput):
     type = 'NullableTextInput'
 
 
-@dataclass()
+@_slotted
 class RichTextField(FieldWidget):
     type = 'RichTextField'
     # If true, remove all HTML tags and render text only
     strip_tags: Optional[bool] = ra_field('stripTags')
 
 
+@_slotted
 class RichTextInput(FieldWidget):
     type = 'RichTextInput'
 
 
-@dataclass()
+@_slotted
 class NumberField(FieldWidget):
     type = 'NumberField'
     # Override the browser locale that used for formatting.
@@ -153,7 +278,7 @@ class NumberField(FieldWidget):
             self.options['useGrouping'] = False
 
 
-@dataclass()
+@_slotted
 class NumberInput(InputWidget):
     type = 'NumberInput'
     # The maximum value to accept for this input.
@@ -165,19 +290,22 @@ class NumberInput(InputWidget):
     step: Optional[JsonNumber] = None
 
 
+@_slotted
 class BooleanField(FieldWidget):
     type = 'BooleanField'
 
 
+@_slotted
 class BooleanInput(InputWidget):
     type = 'BooleanInput'
 
 
+@_slotted
 class NullableBooleanInput(InputWidget):
     type = 'NullableBooleanInput'
 
 
-@dataclass()
+@_slotted
 class DateField(FieldWidget):
     type = 'DateField'
     # Override the browser locale in the date formatting.
@@ -190,28 +318,35 @@ class DateField(FieldWidget):
     show_time: Optional[bool] = ra_field('showTime')
 
 
+@_slotted
 class DateInput(InputWidget):
     type = 'DateInput'
 
 
+@_slotted
 class DateTimeInput(InputWidget):
     type = 'DateTimeInput'
 
 
+@_slotted
 class UrlField(FieldWidget):
     type = 'UrlField'
 
 
+@_slotted
 class EmailField(FieldWidget):
     type = 'EmailField'
 
 
+@_slotted
 class ChipField(FieldWidget):
     type = 'ChipField'
 
 
 @dataclass()
 class ChoicesWidget(Widget):
+    __slots__ = ()
+
     choices: Union[List[str], List[Tuple[SimpleJsonValue, str]]] = None
 
     def to_model(self, field_name: Optional[str]) -> FieldModel:
@@ -231,10 +366,10 @@ class ChoicesWidget(Widget):
 
 
 class ChoicesFieldWidget(ChoicesWidget, FieldWidget):
-    pass
+    __slots__ = ()
 
 
-@dataclass()
+@_slotted
 class SelectField(ChoicesFieldWidget):
     type = 'SelectField'
     # Name of the field to use to display the matching choice,
@@ -244,10 +379,10 @@ class SelectField(ChoicesFieldWidget):
 
 
 class ChoicesInputWidget(ChoicesWidget, InputWidget):
-    pass
+    __slots__ = ()
 
 
-@dataclass()
+@_slotted
 class SelectInput(ChoicesInputWidget):
     type = 'SelectInput'
     # If the input isn’t required, users can select an empty choice
@@ -271,11 +406,12 @@ class SelectInput(ChoicesInputWidget):
         return field_model
 
 
+@_slotted
 class SelectArrayInput(SelectInput):
     type = 'SelectArrayInput'
 
 
-@dataclass()
+@_slotted
 class ArrayField(FieldWidget):
     type = 'ArrayField'
     fields: Dict[str, FieldWidget] = None
@@ -290,12 +426,12 @@ class ArrayField(FieldWidget):
     def to_model(self, field_name: str) -> FieldModel:
         field_model = super().to_model(field_name)
         field_model.params['fields'] = [
-            widget.to_model(name) for name, widget in self.fields.items()
+            _sub_model(widget, name) for name, widget in self.fields.items()
         ]
         return field_model
 
 
-@dataclass()
+@_slotted
 class ArrayInput(InputWidget):
     type = 'ArrayInput'
     fields: Dict[str, InputWidget] = None
@@ -312,18 +448,18 @@ class ArrayInput(InputWidget):
     def to_model(self, field_name: str) -> FieldModel:
         field_model = super().to_model(field_name)
         field_model.params['fields'] = [
-            widget.to_model(name) for name, widget in self.fields.items()
+            _sub_model(widget, name) for name, widget in self.fields.items()
         ]
         return field_model
 
 
-@dataclass()
+@_slotted
 class SimpleArrayField(FieldWidget):
     type = 'SimpleArrayField'
     break_lines: bool = False
 
 
-@dataclass()
+@_slotted
 class NestedArrayField(FieldWidget):
     type = 'NestedArrayField'
     fields: Dict[str, FieldWidget] = None
@@ -338,10 +474,10 @@ class NestedArrayField(FieldWidget):
         if self.single_field:
             field_model.params['fields'] = None
             first_field = list(self.fields.values())[0]
-            field_model.params['single_field'] = first_field.to_model('_value')
+            field_model.params['single_field'] = _sub_model(first_field, '_value')
         else:
             field_model.params['fields'] = [
-                widget.to_model(name) for name, widget in self.fields.items()
+                _sub_model(widget, name) for name, widget in self.fields.items()
             ]
             field_model.params['single_field'] = None
         return field_model
@@ -349,32 +485,36 @@ class NestedArrayField(FieldWidget):
 
 @dataclass()
 class ReferenceFieldBase:
+    __slots__ = ()
+
     reference: str
     reference_field: str
 
 
-@dataclass()
+@_slotted
 class ReferenceField(FieldWidget, ReferenceFieldBase):
     type = 'ReferenceField'
+    _params_exclude = ('reference_field', 'widget')
     widget: FieldWidget = field(default_factory=TextField)
     link: Literal['edit', 'show'] = 'edit'
 
     def to_model(self, field_name: str) -> FieldModel:
         model = super().to_model(field_name)
-        del model.params['reference_field']
-        del model.params['widget']
-        model.params['child'] = self.widget.to_model(self.reference_field)
+        model.params['child'] = _sub_model(self.widget, self.reference_field)
         return model
 
 
 @dataclass()
 class ReferenceInputBase:
+    __slots__ = ()
+
     reference: str
 
 
-@dataclass()
+@_slotted
 class ReferenceInput(InputWidget, ReferenceInputBase):
     type = 'ReferenceInput'
+    _params_exclude = ('validators', 'widget', 'option_text')
     per_page: Optional[int] = ra_field('perPage', default=500)
     # Default is SelectInput
     widget: Optional[ChoicesInputWidget] = None
@@ -389,21 +529,20 @@ class ReferenceInput(InputWidget, ReferenceInputBase):
 
     def to_model(self, field_name: str) -> FieldModel:
         model = super().to_model(field_name)
-        widget: Optional[InputWidget] = model.params.pop('widget', None)
-        option_text = model.params.pop('optionText', None)
+        widget: Optional[InputWidget] = self.widget
         if not widget:
             widget = SelectInput(
                 label=self.label,
                 empty_value=self.empty_value,
                 empty_text=self.empty_text,
-                option_text=option_text,
+                option_text=self.option_text,
             )
 
         if self.validators:
-            widget.validators = self.validators
+            widget = widget.replace(validators=self.validators)
             model.validators = []
 
-        child_model = widget.to_model(field_name=None)
+        child_model = _sub_model(widget, None)
         # ReferenceInput doesn’t accept the common input props (like label);
         # it is the responsibility of the child component to apply them.
         for name in ('label', 'emptyValue', 'emptyText', 'optionText'):
@@ -415,10 +554,12 @@ class ReferenceInput(InputWidget, ReferenceInputBase):
 
 @dataclass()
 class DynSelectBase:
+    __slots__ = ()
+
     group: str
 
 
-@dataclass()
+@_slotted
 class DynSelectField(FieldWidget, DynSelectBase):
     """It is SelectFiled with choices that dynamically loads
     from AdminChoices resource."""
@@ -439,7 +580,7 @@ class DynSelectField(FieldWidget, DynSelectBase):
         return model
 
 
-@dataclass()
+@_slotted
 class DynSelectInput(InputWidget, DynSelectBase):
     """It is SelectInput with choices that dynamically loads
     from AdminChoices resource."""
@@ -465,7 +606,7 @@ class DynSelectInput(InputWidget, DynSelectBase):
 # Mapping
 
 
-@dataclass()
+@_slotted
 class MappingField(Widget):
     type = 'MappingField'
     fields: Dict[str, FieldWidget] = None
@@ -477,12 +618,12 @@ class MappingField(Widget):
     def to_model(self, field_name: str) -> FieldModel:
         field_model = super().to_model(field_name)
         field_model.params['fields'] = [
-            widget.to_model(name) for name, widget in self.fields.items()
+            _sub_model(widget, name) for name, widget in self.fields.items()
         ]
         return field_model
 
 
-@dataclass()
+@_slotted
 class MappingInput(InputWidget):
     type = 'MappingInput'
     fields: Dict[str, InputWidget] = None
@@ -494,7 +635,7 @@ class MappingInput(InputWidget):
     def to_model(self, field_name: str) -> FieldModel:
         field_model = super().to_model(field_name)
         field_model.params['fields'] = [
-            widget.to_model(name) for name, widget in self.fields.items()
+            _sub_model(widget, name) for name, widget in self.fields.items()
         ]
         return field_model
 
@@ -502,7 +643,7 @@ class MappingInput(InputWidget):
 # Json
 
 
-@dataclass()
+@_slotted
 class JsonField(FieldWidget):
     type = 'JsonField'
     # The indent-width for nested objects
@@ -514,7 +655,7 @@ class JsonField(FieldWidget):
     collapse_label: Optional[str] = None
 
 
-@dataclass()
+@_slotted
 class JsonInput(TextInput):
     type = 'JsonInput'
     # The indent-width for nested objects, default: 2
@@ -528,7 +669,7 @@ class JsonInput(TextInput):
 # File
 
 
-@dataclass()
+@_slotted
 class FileField(FieldWidget):
     type = 'FileField'
     # Relative path to a source of file URL
@@ -558,7 +699,7 @@ class FileField(FieldWidget):
         return model
 
 
-@dataclass()
+@_slotted
 class FileInput(InputWidget):
     type = 'FileInput'
     # Accepted file type(s). When empty, all file types are accepted.
@@ -100,6 +100,9 @@ setup(
             'cykooz.testing',
             'restfw[test]',
         ],
+        'brotli': [
+            'brotli',
+        ],
         'docs': [
             'WebTest',
             'sphinx',
@@ -114,6 +117,7 @@ setup(
     entry_points={
         'console_scripts': [
             'admin_test = restfw_admin.runtests:runtests [test]',
+            'admin_compile_api_info = restfw_admin.artifact:main',
         ],
     },
 )